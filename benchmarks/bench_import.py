@@ -0,0 +1,84 @@
+# Cold-start import budget for healthcare_tutorial.
+#
+# Each target is imported in a fresh interpreter after pandas/numpy (which every module
+# needs anyway); the script asserts the extra time stays under the budget and that heavy
+# optional dependencies are not pulled in.
+#
+#   python benchmarks/bench_import.py [--budget-ms 60] [--repeat 5]
+#
+# Exit code is 1 when any target exceeds its budget or imports a forbidden module.
+
+import os, sys
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SRC = os.path.join(ROOT, "src")
+
+import argparse
+import json
+import subprocess
+
+HEAVY = ["sklearn", "matplotlib", "matplotlib.pyplot", "missingno", "scipy", "pyarrow.dataset"]
+
+# target import statement -> heavy modules it must not load
+TARGETS = {
+    "import healthcare_tutorial": HEAVY,
+    "import healthcare_tutorial.dq": HEAVY,
+    "import healthcare_tutorial.loaders": HEAVY,
+    "import healthcare_tutorial.analytics": HEAVY,
+    "import healthcare_tutorial.etl": HEAVY,
+    "import healthcare_tutorial.ml_clean": HEAVY,
+    "import healthcare_tutorial.viz": HEAVY,
+    "import healthcare_tutorial.linkage": HEAVY,
+    "import healthcare_tutorial.cohort": HEAVY,
+    "import healthcare_tutorial.features": HEAVY,
+    "import healthcare_tutorial.shared": HEAVY,
+    "from healthcare_tutorial import validate_dates, cross_table_consistency": HEAVY,
+}
+
+_CHILD = r"""
+import sys, time, json
+sys.path.insert(0, {src!r})
+t0 = time.perf_counter()
+import numpy, pandas
+t1 = time.perf_counter()
+{stmt}
+t2 = time.perf_counter()
+print(json.dumps({{"base_s": t1 - t0, "target_s": t2 - t1,
+                  "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def measure(stmt: str, heavy: list[str], repeat: int) -> dict:
+    runs = []
+    for _ in range(repeat):
+        code = _CHILD.format(src=SRC, stmt=stmt, heavy=heavy)
+        out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+        runs.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    best = min(runs, key=lambda r: r["target_s"])
+    return {"target_ms": best["target_s"] * 1e3, "base_ms": best["base_s"] * 1e3, "loaded": best["loaded"]}
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description="healthcare_tutorial import-time budget")
+    ap.add_argument("--budget-ms", type=float, default=60.0,
+                    help="max import time on top of numpy+pandas, per target")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--out", default=None, help="optional JSON output path")
+    args = ap.parse_args(argv)
+
+    failures, report = [], {}
+    for stmt, heavy in TARGETS.items():
+        res = measure(stmt, heavy, args.repeat)
+        report[stmt] = res
+        ok = res["target_ms"] <= args.budget_ms and not res["loaded"]
+        print(f"{'ok  ' if ok else 'FAIL'} {stmt:<72} {res['target_ms']:7.1f} ms"
+              f"  (numpy+pandas {res['base_ms']:.0f} ms){'  loaded: ' + ', '.join(res['loaded']) if res['loaded'] else ''}")
+        if not ok:
+            failures.append(stmt)
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump({"budget_ms": args.budget_ms, "targets": report}, f, indent=2)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,264 @@
+# Scaling benchmarks for the public healthcare_tutorial API.
+#
+# Builds synthetic inputs with SyntheticConfig at several patient counts, times and
+# memory-profiles every exported function in dq, analytics, etl, ml_clean and loaders,
+# writes JSON results plus a log-log scaling plot, and optionally compares against a
+# stored baseline.
+#
+#   python benchmarks/bench_scaling.py --scales 10000,100000 --out bench_results.json
+#   python benchmarks/bench_scaling.py --baseline benchmarks/baseline.json --threshold 0.25
+#
+# Exit code is 1 when any function regresses past the threshold.
+
+import os, sys
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SRC = os.path.join(ROOT, "src")
+if SRC not in sys.path:
+    sys.path.insert(0, SRC)
+
+import argparse
+import json
+import platform
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from healthcare_tutorial import dq, analytics, etl, ml_clean, loaders
+from healthcare_tutorial.data_gen import SyntheticConfig, make_patients, make_admissions, make_labs
+
+MODULES = {"dq": dq, "analytics": analytics, "etl": etl, "ml_clean": ml_clean, "loaders": loaders}
+DEFAULT_SCALES = [10_000, 100_000, 1_000_000, 10_000_000]
+
+
+def make_inputs(n_patients: int, workdir: str) -> dict:
+    """Generate one synthetic dataset plus the derived frames the cases need."""
+    cfg = SyntheticConfig(n_patients=n_patients)
+    patients = make_patients(cfg)
+    admissions = make_admissions(patients, cfg)
+    labs = make_labs(patients, cfg)
+    csv_dir = os.path.join(workdir, f"csv_{n_patients}")
+    os.makedirs(csv_dir, exist_ok=True)
+    patients.to_csv(os.path.join(csv_dir, "patients.csv"), index=False)
+    admissions.to_csv(os.path.join(csv_dir, "admissions.csv"), index=False)
+    labs.to_csv(os.path.join(csv_dir, "labs.csv"), index=False)
+    adm_enriched = admissions.merge(patients[["PatientID", "Age", "DiagnosisName"]], on="PatientID", how="left")
+    patients_gappy = patients.assign(Age=patients["Age"].astype(float).mask(np.arange(len(patients)) % 20 == 0))
+    return {
+        "patients": patients,
+        "admissions": admissions,
+        "labs": labs,
+        "adm_enriched": adm_enriched,
+        "labs_attributed": analytics.attribute_labs_to_admissions(labs, admissions),
+        "patients_gappy": patients_gappy,
+        "csv_dir": csv_dir,
+        "out_dir": os.path.join(workdir, "out"),
+    }
+
+
+def _fit_pipeline(d: dict):
+    num, cat = ["Age", "LengthOfStay"], ["HospitalSite", "DiagnosisName"]
+    return ml_clean.build_cleaning_pipeline(num, cat).fit_transform(d["adm_enriched"][num + cat])
+
+
+# One entry per exported function: "module.name" -> callable(inputs)
+CASES = {
+    "dq.comprehensive_data_profile": lambda d: dq.comprehensive_data_profile(d["patients"]),
+    "dq.validate_pediatric_ages": lambda d: dq.validate_pediatric_ages(d["patients"]),
+    "dq.validate_lab_ranges": lambda d: dq.validate_lab_ranges(d["labs"]),
+    "dq.validate_dates": lambda d: dq.validate_dates(d["admissions"]),
+    "dq.validate_length_of_stay_consistency": lambda d: dq.validate_length_of_stay_consistency(d["admissions"]),
+    "dq.validate_gender_codes": lambda d: dq.validate_gender_codes(d["patients"]),
+    "dq.validate_icd10_format": lambda d: dq.validate_icd10_format(d["patients"], code_col="DiagnosisName"),
+    "dq.cross_table_consistency": lambda d: dq.cross_table_consistency(d["patients"], d["admissions"], d["labs"]),
+    "dq.incremental_dq": lambda d: dq.incremental_dq(d["patients"], d["admissions"], d["labs"],
+                                                     state_dir=os.path.join(d["out_dir"], "dq_state"), commit=False),
+    "analytics.multi_level_summary": lambda d: analytics.multi_level_summary(d["adm_enriched"]),
+    "analytics.add_timeline_features": lambda d: analytics.add_timeline_features(d["adm_enriched"]),
+    "analytics.high_risk_subset": lambda d: analytics.high_risk_subset(d["adm_enriched"]),
+    "analytics.create_comprehensive_patient_view": lambda d: analytics.create_comprehensive_patient_view(d["patients"], d["labs"], d["admissions"]),
+    "analytics.pediatric_analysis_by_age_group": lambda d: analytics.pediatric_analysis_by_age_group(d["adm_enriched"]),
+    "analytics.calculate_clinical_flags": lambda d: analytics.calculate_clinical_flags(d["adm_enriched"]),
+    "analytics.pediatric_age_group_codes": lambda d: analytics.pediatric_age_group_codes(d["adm_enriched"]["Age"]),
+    "analytics.age_at_admission_days": lambda d: analytics.age_at_admission_days(
+        d["admissions"]["AdmissionDate"] - pd.Timedelta(days=3650), d["admissions"]["AdmissionDate"]),
+    "analytics.attribute_labs_to_admissions": lambda d: analytics.attribute_labs_to_admissions(d["labs"], d["admissions"]),
+    "analytics.admission_lab_summary": lambda d: analytics.admission_lab_summary(d["labs_attributed"], d["admissions"]),
+    "analytics.daily_census": lambda d: analytics.daily_census(d["admissions"], with_overlaps=True),
+    "etl.ensure_output_dir": lambda d: etl.ensure_output_dir(d["out_dir"]),
+    "etl.simple_cleaning": lambda d: etl.simple_cleaning(d["labs"], dropna_cols=["PatientID", "TestResultValue"], numeric_coerce=["TestResultValue"]),
+    "etl.iqr_outlier_flags": lambda d: etl.iqr_outlier_flags(d["admissions"]["LengthOfStay"].astype(float)),
+    "etl.build_star_schema": lambda d: etl.build_star_schema(d["patients"], d["admissions"], d["labs"]),
+    "ml_clean.knn_impute_numeric": lambda d: ml_clean.knn_impute_numeric(d["patients_gappy"], cols=["Age"]),
+    "ml_clean.build_cleaning_pipeline": _fit_pipeline,
+    "loaders.load_healthcare_data": lambda d: loaders.load_healthcare_data(data_dir=d["csv_dir"]),
+    "loaders.load_multi_source_data": lambda d: loaders.load_multi_source_data([d["csv_dir"]]),
+}
+
+
+def exported_functions() -> list[str]:
+    """All callables listed in __all__ of the benchmarked modules."""
+    names = []
+    for mod_name, mod in MODULES.items():
+        for attr in getattr(mod, "__all__", []):
+            if callable(getattr(mod, attr)) and not isinstance(getattr(mod, attr), type):
+                names.append(f"{mod_name}.{attr}")
+    return names
+
+
+def measure(fn, inputs: dict, repeat: int = 3) -> dict:
+    """Best-of-`repeat` wall time, then one tracemalloc pass for peak traced memory."""
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(inputs)
+        times.append(time.perf_counter() - t0)
+    tracemalloc.start()
+    try:
+        fn(inputs)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"seconds": min(times), "peak_bytes": int(peak)}
+
+
+def scaling_exponent(scales: list[int], seconds: list[float]) -> float | None:
+    """Slope of log(time) vs log(n); ~1 is linear, ~2 quadratic."""
+    pts = [(n, s) for n, s in zip(scales, seconds) if s is not None and s > 0]
+    if len(pts) < 2:
+        return None
+    x = np.log([p[0] for p in pts])
+    y = np.log([p[1] for p in pts])
+    return float(np.polyfit(x, y, 1)[0])
+
+
+def run(scales: list[int], names: list[str], repeat: int, max_seconds: float) -> dict:
+    results = {name: {"scales": [], "seconds": [], "peak_bytes": [], "status": []} for name in names}
+    with tempfile.TemporaryDirectory() as workdir:
+        for n in scales:
+            print(f"[bench] generating inputs for n_patients={n:,}")
+            inputs = make_inputs(n, workdir)
+            for name in names:
+                res = results[name]
+                last = next(((sc, s) for sc, s in zip(res["scales"][::-1], res["seconds"][::-1]) if s is not None), None)
+                if name not in CASES:
+                    status, seconds, peak = "no_case", None, None
+                elif last is not None and last[1] * n / last[0] > max_seconds:
+                    # Linear extrapolation from the previous scale already blows the budget
+                    status, seconds, peak = "skipped_budget", None, None
+                else:
+                    m = measure(CASES[name], inputs, repeat=repeat)
+                    status, seconds, peak = "ok", m["seconds"], m["peak_bytes"]
+                    print(f"  {name:<50} {seconds:9.4f}s  peak={peak / 2**20:9.1f} MiB")
+                res["scales"].append(n)
+                res["seconds"].append(seconds)
+                res["peak_bytes"].append(peak)
+                res["status"].append(status)
+            del inputs
+    for res in results.values():
+        res["exponent"] = scaling_exponent(res["scales"], res["seconds"])
+    return results
+
+
+def compare_to_baseline(results: dict, baseline: dict, threshold: float,
+                        min_seconds: float = 0.005) -> list[dict]:
+    """Return (function, scale) pairs slower than baseline * (1 + threshold).
+
+    Timings below `min_seconds` are treated as noise and never flagged.
+    """
+    regressions = []
+    base_funcs = baseline.get("functions", {})
+    for name, res in results.items():
+        base = base_funcs.get(name)
+        if not base:
+            continue
+        base_by_scale = dict(zip(base["scales"], base["seconds"]))
+        for n, s in zip(res["scales"], res["seconds"]):
+            b = base_by_scale.get(n)
+            if s is None or b is None or b <= 0 or s < min_seconds:
+                continue
+            ratio = s / b
+            if ratio > 1 + threshold:
+                regressions.append({"function": name, "scale": n, "seconds": s, "baseline_seconds": b, "ratio": round(ratio, 3)})
+    return regressions
+
+
+def plot_scaling(results: dict, path: str) -> None:
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    fig, ax = plt.subplots(figsize=(10, 7))
+    for name, res in sorted(results.items()):
+        pts = [(n, s) for n, s in zip(res["scales"], res["seconds"]) if s is not None]
+        if not pts:
+            continue
+        exp = res["exponent"]
+        label = f"{name} (k={exp:.2f})" if exp is not None else name
+        ax.plot([p[0] for p in pts], [p[1] for p in pts], marker="o", label=label)
+    ax.set_xscale("log"); ax.set_yscale("log")
+    ax.set_xlabel("n_patients"); ax.set_ylabel("seconds (best of repeats)")
+    ax.set_title("healthcare_tutorial scaling")
+    ax.legend(fontsize=6, loc="upper left")
+    fig.tight_layout(); fig.savefig(path, dpi=120); plt.close(fig)
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description="Scaling benchmarks for healthcare_tutorial")
+    ap.add_argument("--scales", default=",".join(str(s) for s in DEFAULT_SCALES),
+                    help="comma-separated n_patients values (default: 10K..10M)")
+    ap.add_argument("--only", default="", help="comma-separated substrings to select functions")
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--max-seconds", type=float, default=120.0,
+                    help="skip a function at larger scales once its extrapolated time exceeds this")
+    ap.add_argument("--out", default="bench_results.json")
+    ap.add_argument("--plot", default="bench_scaling.png")
+    ap.add_argument("--baseline", default=None, help="baseline JSON to compare against")
+    ap.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown ratio, e.g. 0.25 = 25%%")
+    ap.add_argument("--min-seconds", type=float, default=0.005, help="ignore timings faster than this when comparing")
+    ap.add_argument("--save-baseline", default=None, help="also write results to this baseline path")
+    args = ap.parse_args(argv)
+
+    scales = sorted(int(s) for s in args.scales.split(",") if s.strip())
+    names = exported_functions()
+    if args.only:
+        keys = [k.strip() for k in args.only.split(",") if k.strip()]
+        names = [n for n in names if any(k in n for k in keys)]
+    missing = [n for n in names if n not in CASES]
+    if missing:
+        print("[bench] no benchmark case for:", ", ".join(missing))
+
+    results = run(scales, names, repeat=args.repeat, max_seconds=args.max_seconds)
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "scales": scales,
+        },
+        "functions": results,
+    }
+    if args.baseline and os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        report["regressions"] = compare_to_baseline(results, baseline, args.threshold, args.min_seconds)
+        report["threshold"] = args.threshold
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.plot:
+        plot_scaling(results, args.plot)
+
+    print("[bench] wrote", args.out)
+    for r in report.get("regressions", []):
+        print(f"[bench] REGRESSION {r['function']} @ {r['scale']:,}: {r['seconds']:.4f}s vs {r['baseline_seconds']:.4f}s (x{r['ratio']})")
+    return 1 if report.get("regressions") else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
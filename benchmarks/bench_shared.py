@@ -0,0 +1,98 @@
+# Pickled DataFrames vs shared-memory handles for process-pool DQ work.
+#
+#   python benchmarks/bench_shared.py --patients 200000,1000000 [--workers 4] [--repeat 4]
+#
+# Each mode runs the same dq validators on a ProcessPoolExecutor. "pickle" sends the
+# admissions/labs frames with every task; "shared" publishes them once with SharedTables
+# and sends a TableHandle. Reports publish time, bytes sent per task and wall time.
+
+import os, sys
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SRC = os.path.join(ROOT, "src")
+if SRC not in sys.path:
+    sys.path.insert(0, SRC)
+
+import argparse
+import json
+import pickle
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from healthcare_tutorial import dq
+from healthcare_tutorial.data_gen import SyntheticConfig, make_patients, make_admissions, make_labs
+from healthcare_tutorial.shared import SharedTables, attach
+
+# validator -> table it reads
+VALIDATORS = {
+    "validate_dates": "admissions",
+    "validate_length_of_stay_consistency": "admissions",
+    "validate_lab_ranges": "labs",
+}
+
+
+def make_tables(n_patients: int) -> dict[str, pd.DataFrame]:
+    """Synthetic admissions/labs from the same generators as bench_scaling."""
+    cfg = SyntheticConfig(n_patients=n_patients)
+    patients = make_patients(cfg)
+    return {"admissions": make_admissions(patients, cfg), "labs": make_labs(patients, cfg)}
+
+
+def _run_pickled(name: str, df: pd.DataFrame) -> dict:
+    return getattr(dq, name)(df).sum().to_dict()
+
+
+def _run_shared(name: str, handle) -> dict:
+    return getattr(dq, name)(attach(handle)).sum().to_dict()
+
+
+def run_mode(mode: str, tables: dict, workers: int, repeat: int) -> dict:
+    t0 = time.perf_counter()
+    shared = SharedTables() if mode == "shared" else None
+    args = shared.publish(**tables) if shared else tables
+    publish_s = time.perf_counter() - t0
+    tasks = [(name, args[table]) for name, table in VALIDATORS.items() for _ in range(repeat)]
+    sent = sum(len(pickle.dumps(arg, protocol=pickle.HIGHEST_PROTOCOL)) for _, arg in tasks) / len(tasks)
+    fn = _run_shared if shared else _run_pickled
+    try:
+        t1 = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(fn, *zip(*tasks)))
+        run_s = time.perf_counter() - t1
+    finally:
+        if shared:
+            shared.close()
+    return {"mode": mode, "publish_s": publish_s, "run_s": run_s, "bytes_per_task": sent, "results": results}
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description="pickle vs shared-memory table handoff")
+    ap.add_argument("--patients", default="200000", help="comma-separated patient counts")
+    ap.add_argument("--workers", type=int, default=min(4, os.cpu_count() or 1))
+    ap.add_argument("--repeat", type=int, default=4, help="tasks per validator")
+    ap.add_argument("--out", default=None, help="optional JSON output path")
+    args = ap.parse_args(argv)
+
+    rows = []
+    for n in [int(s) for s in args.patients.split(",") if s.strip()]:
+        tables = make_tables(n)
+        sizes = {name: len(df) for name, df in tables.items()}
+        by_mode = {mode: run_mode(mode, tables, args.workers, args.repeat) for mode in ("pickle", "shared")}
+        if by_mode["pickle"]["results"] != by_mode["shared"]["results"]:
+            print(f"[bench] n={n}: shared results differ from pickled results")
+            return 1
+        for mode, res in by_mode.items():
+            res.pop("results")
+            rows.append({"patients": n, "admissions": sizes["admissions"], "labs": sizes["labs"],
+                         "workers": args.workers, **res})
+            print(f"patients={n:>10,} labs={sizes['labs']:>11,} {mode:<7} publish={res['publish_s']:7.3f}s  run={res['run_s']:7.3f}s  "
+                  f"sent/task={res['bytes_per_task'] / 2 ** 20:9.2f} MiB")
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(rows, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
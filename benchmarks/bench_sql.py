@@ -0,0 +1,75 @@
+# pandas vs embedded SQL for the analytics summaries.
+#
+#   python benchmarks/bench_sql.py --scales 10000,100000 [--engine sqlite|duckdb] [--db path]
+#
+# Reports table load/index time separately from query time, since a persistent database
+# file pays the load once and then serves many queries.
+
+import os, sys
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SRC = os.path.join(ROOT, "src")
+if SRC not in sys.path:
+    sys.path.insert(0, SRC)
+
+import argparse
+import json
+import time
+
+from healthcare_tutorial import analytics
+from healthcare_tutorial.data_gen import SyntheticConfig, make_patients, make_admissions, make_labs
+from healthcare_tutorial.sql_backend import SQLBackend
+
+
+def _best(fn, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return min(times)
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description="pandas vs SQL backend timings")
+    ap.add_argument("--scales", default="10000,100000")
+    ap.add_argument("--engine", default="auto")
+    ap.add_argument("--db", default=":memory:")
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--out", default=None, help="optional JSON output path")
+    args = ap.parse_args(argv)
+
+    rows = []
+    for n in [int(s) for s in args.scales.split(",") if s.strip()]:
+        cfg = SyntheticConfig(n_patients=n)
+        patients = make_patients(cfg)
+        admissions = make_admissions(patients, cfg)
+        labs = make_labs(patients, cfg)
+        enriched = admissions.merge(patients[["PatientID", "Age", "DiagnosisName"]], on="PatientID", how="left")
+
+        with SQLBackend(args.db, engine=args.engine) as db:
+            t0 = time.perf_counter()
+            db.load_tables(patients, admissions, labs)
+            load_s = time.perf_counter() - t0
+            cases = {
+                "multi_level_summary": (lambda: analytics.multi_level_summary(enriched), db.multi_level_summary),
+                "create_comprehensive_patient_view": (
+                    lambda: analytics.create_comprehensive_patient_view(patients, labs, admissions),
+                    db.create_comprehensive_patient_view),
+                "patient_history": (
+                    lambda: (admissions[admissions["PatientID"] == n // 2], labs[labs["PatientID"] == n // 2]),
+                    lambda: db.patient_history(n // 2)),
+            }
+            for name, (pd_fn, sql_fn) in cases.items():
+                pd_s, sql_s = _best(pd_fn, args.repeat), _best(sql_fn, args.repeat)
+                rows.append({"n_patients": n, "case": name, "engine": db.engine, "load_s": load_s,
+                             "pandas_s": pd_s, "sql_s": sql_s, "speedup": pd_s / sql_s if sql_s else None})
+                print(f"n={n:>10,} {name:<36} pandas={pd_s:8.4f}s  {db.engine}={sql_s:8.4f}s  "
+                      f"(load {load_s:.2f}s)")
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(rows, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -8,10 +8,11 @@ FROM patients p
 LEFT JOIN labs l ON p.PatientID = l.PatientID
 GROUP BY p.PatientID, p.Age, p.DiagnosisName;
 
--- Data quality check query
-SELECT HospitalSite,
-       COUNT(*) AS total_patients,
-       SUM(CASE WHEN Age IS NULL THEN 1 ELSE 0 END) AS missing_age,
-       SUM(CASE WHEN DischargeDate < AdmissionDate THEN 1 ELSE 0 END) AS invalid_dates
-FROM patients
-GROUP BY HospitalSite;
+-- Data quality check query (dates live on admissions; Age on patients)
+SELECT a.HospitalSite,
+       COUNT(DISTINCT a.PatientID) AS total_patients,
+       SUM(CASE WHEN p.Age IS NULL THEN 1 ELSE 0 END) AS missing_age,
+       SUM(CASE WHEN a.DischargeDate < a.AdmissionDate THEN 1 ELSE 0 END) AS invalid_dates
+FROM admissions a
+LEFT JOIN patients p ON p.PatientID = a.PatientID
+GROUP BY a.HospitalSite;
@@ -1 +1,110 @@
-# Makes this a package
+# Makes this a package. Public names are resolved lazily (PEP 562) so that
+# `import healthcare_tutorial.dq` never pays for scikit-learn or matplotlib.
+from __future__ import annotations
+import importlib
+
+_SUBMODULES = {
+    "analytics", "cohort", "data_gen", "dq", "etl", "features", "instrument", "linkage", "loaders",
+    "ml_clean", "patient_index", "pipeline", "shared", "sql_backend", "viz",
+}
+
+# public name -> submodule that defines it
+_EXPORTS = {
+    # data_gen
+    "SyntheticConfig": "data_gen",
+    "make_patients": "data_gen",
+    "make_admissions": "data_gen",
+    "make_labs": "data_gen",
+    # loaders
+    "load_healthcare_data": "loaders",
+    "load_multi_source_data": "loaders",
+    # dq
+    "comprehensive_data_profile": "dq",
+    "validate_pediatric_ages": "dq",
+    "validate_lab_ranges": "dq",
+    "validate_dates": "dq",
+    "validate_length_of_stay_consistency": "dq",
+    "validate_gender_codes": "dq",
+    "validate_icd10_format": "dq",
+    "cross_table_consistency": "dq",
+    "incremental_dq": "dq",
+    "INCREMENTAL_RULES": "dq",
+    "LAB_RANGES": "dq",
+    # analytics
+    "multi_level_summary": "analytics",
+    "add_timeline_features": "analytics",
+    "high_risk_subset": "analytics",
+    "create_comprehensive_patient_view": "analytics",
+    "pediatric_analysis_by_age_group": "analytics",
+    "pediatric_age_group_codes": "analytics",
+    "age_at_admission_days": "analytics",
+    "calculate_clinical_flags": "analytics",
+    "attribute_labs_to_admissions": "analytics",
+    "admission_lab_summary": "analytics",
+    "daily_census": "analytics",
+    "PEDIATRIC_AGE_GROUPS": "analytics",
+    "PEDIATRIC_AGE_EDGES": "analytics",
+    # etl
+    "ensure_output_dir": "etl",
+    "simple_cleaning": "etl",
+    "iqr_outlier_flags": "etl",
+    "build_star_schema": "etl",
+    # ml_clean
+    "knn_impute_numeric": "ml_clean",
+    "build_cleaning_pipeline": "ml_clean",
+    # features
+    "LAB_FEATURE_STATS": "features",
+    "LabFeatures": "features",
+    "build_lab_features": "features",
+    "hstack_features": "features",
+    # viz
+    "histogram_summary": "viz",
+    "site_summary": "viz",
+    "missingness_summary": "viz",
+    "show_missing_matrix": "viz",
+    "plot_age_distribution": "viz",
+    "plot_los_by_site": "viz",
+    # pipeline
+    "fingerprint": "pipeline",
+    "Node": "pipeline",
+    "Pipeline": "pipeline",
+    "healthcare_pipeline": "pipeline",
+    # sql_backend
+    "SQLBackend": "sql_backend",
+    "split_sql_statements": "sql_backend",
+    # linkage
+    "normalize_patients": "linkage",
+    "link_patients": "linkage",
+    "deduplicate_patients": "linkage",
+    # shared
+    "TableHandle": "shared",
+    "SharedTables": "shared",
+    "attach": "shared",
+    "attach_columns": "shared",
+    "detach": "shared",
+    # patient_index
+    "PatientIndex": "patient_index",
+    # cohort
+    "Cohort": "cohort",
+    "CohortIndex": "cohort",
+    "COHORT_ATTRIBUTES": "cohort",
+    "FLAG_ATTRIBUTES": "cohort",
+}
+
+
+def __getattr__(name: str):
+    if name in _SUBMODULES:
+        return importlib.import_module(f"{__name__}.{name}")
+    mod = _EXPORTS.get(name)
+    if mod is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f"{__name__}.{mod}"), name)
+    globals()[name] = value  # cache so later lookups skip __getattr__
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | _SUBMODULES | set(_EXPORTS))
+
+
+__all__ = sorted(_EXPORTS)
@@ -1,9 +1,11 @@
 from __future__ import annotations
 import pandas as pd
 import numpy as np
+from .instrument import instrument
 
 # Analysis helpers
 
+@instrument
 def multi_level_summary(df: pd.DataFrame) -> pd.DataFrame:
     return (
         df.groupby(["HospitalSite", "DiagnosisName"]).agg({
@@ -13,6 +15,7 @@ def multi_level_summary(df: pd.DataFrame) -> pd.DataFrame:
         }).round(2)
     )
 
+@instrument
 def add_timeline_features(df: pd.DataFrame) -> pd.DataFrame:
     out = df.copy()
     out["RankByAdmission"] = out.groupby("HospitalSite")["AdmissionDate"].rank(method="first")
@@ -20,11 +23,13 @@ def add_timeline_features(df: pd.DataFrame) -> pd.DataFrame:
     out["PrevAdmission"] = out.groupby("PatientID")["AdmissionDate"].shift(1)
     return out
 
+@instrument
 def high_risk_subset(df: pd.DataFrame) -> pd.DataFrame:
     q75 = df.groupby("DiagnosisName")["LengthOfStay"].transform(lambda s: s.quantile(0.75))
     return df[(df["Age"] < 2) & (df["LengthOfStay"] > q75)]
 
 
+@instrument
 def create_comprehensive_patient_view(patients_df: pd.DataFrame,
                                       labs_df: pd.DataFrame,
                                       admissions_df: pd.DataFrame) -> pd.DataFrame:
@@ -50,18 +55,117 @@ def create_comprehensive_patient_view(patients_df: pd.DataFrame,
     return result
 
 
-def pediatric_analysis_by_age_group(df: pd.DataFrame) -> pd.DataFrame:
-    # Define pediatric bins in years; Neonate as <28 days ~ 0.0767 years
-    age_bins = [0, 28/365, 1, 5, 12, 18]
-    age_labels = ["Neonate", "Infant", "Preschool", "School-age", "Adolescent"]
-    out = df.copy()
-    out["PediatricAgeGroup"] = pd.cut(out["Age"], bins=age_bins, labels=age_labels, include_lowest=True)
-    return out.groupby(["PediatricAgeGroup", "HospitalSite"], observed=True).agg({
-        "LengthOfStay": ["mean", "median"],
-        "PatientID": "count",
-    }).round(2)
+PEDIATRIC_AGE_GROUPS = ["Neonate", "Infant", "Preschool", "School-age", "Adolescent"]
+# Bin edges per unit. Years keep the pd.cut(..., include_lowest=True) semantics (right-closed,
+# Neonate as <=28/365 y); days are half-open [lo, hi) so days 0-27 are Neonate.
+PEDIATRIC_AGE_EDGES = {
+    "years": np.array([0, 28 / 365, 1, 5, 12, 18], dtype=float),
+    "days": np.array([0, 28, 365, 1826, 4383, 6575], dtype=float),
+}
+
+
+def age_at_admission_days(birth: pd.Series, admit: pd.Series) -> np.ndarray:
+    """Whole days between birth date and admission date (NaN where either is missing)."""
+    b = pd.to_datetime(birth, errors="coerce").to_numpy(dtype="datetime64[D]")
+    a = pd.to_datetime(admit, errors="coerce").to_numpy(dtype="datetime64[D]")
+    days = (a - b).astype("timedelta64[D]").astype(float)
+    days[np.isnat(a) | np.isnat(b)] = np.nan
+    return days
+
+
+def pediatric_age_group_codes(age, unit: str = "years") -> np.ndarray:
+    """Integer codes into PEDIATRIC_AGE_GROUPS via searchsorted; -1 for missing/out of range."""
+    edges = PEDIATRIC_AGE_EDGES[unit]
+    x = pd.to_numeric(pd.Series(age), errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+    if unit == "years":
+        codes = np.searchsorted(edges, x, side="left") - 1
+        codes[x == edges[0]] = 0  # include_lowest
+    else:
+        codes = np.searchsorted(edges, x, side="right") - 1
+    codes[np.isnan(x) | (codes < 0) | (codes >= len(edges) - 1)] = -1
+    return codes.astype(np.int8)
+
+
+def _segment_medians(keys: np.ndarray, values: np.ndarray, n_groups: int) -> np.ndarray:
+    """Median of `values` per integer key (NaN for empty keys).
+
+    Integer-valued data with a small range (e.g. LOS in days) uses a per-key histogram;
+    anything else is bucketed by key and partitioned per bucket.
+    """
+    if len(values) and np.array_equal(values, np.floor(values)):
+        vmin = values.min()
+        span = int(values.max() - vmin) + 1
+        if n_groups * span <= 20_000_000:
+            flat = keys * span + (values - vmin).astype(np.int64)
+            cum = np.bincount(flat, minlength=n_groups * span).reshape(n_groups, span).cumsum(axis=1)
+            counts = cum[:, -1]
+            lo = (cum > ((counts - 1) // 2)[:, None]).argmax(axis=1)
+            hi = (cum > (counts // 2)[:, None]).argmax(axis=1)
+            return np.where(counts > 0, vmin + (lo + hi) / 2, np.nan)
+    # Bucket rows by key (stable radix-friendly sort), then partial-sort each bucket
+    small = keys.astype(np.int16) if n_groups < np.iinfo(np.int16).max else keys
+    v = values[np.argsort(small, kind="stable")]
+    counts = np.bincount(keys, minlength=n_groups)
+    ends = np.cumsum(counts)
+    med = np.full(n_groups, np.nan)
+    for g in np.flatnonzero(counts):
+        seg = v[ends[g] - counts[g]:ends[g]]
+        lo, hi = (counts[g] - 1) // 2, counts[g] // 2
+        part = np.partition(seg, [lo, hi])
+        med[g] = (part[lo] + part[hi]) / 2
+    return med
+
+
+@instrument
+def pediatric_analysis_by_age_group(df: pd.DataFrame,
+                                    age_col: str = "Age",
+                                    unit: str = "years",
+                                    birth_col: str | None = None,
+                                    admit_col: str = "AdmissionDate") -> pd.DataFrame:
+    """LOS mean/median and admission counts per pediatric age group and site.
+
+    Age comes from `age_col` in `unit` ("years" or "days"), or, when `birth_col` is given,
+    from the age in days at `admit_col`. Groups are combined integer codes reduced with
+    bincount, so no copy of `df` is made.
+    """
+    if birth_col is not None:
+        age, unit = age_at_admission_days(df[birth_col], df[admit_col]), "days"
+    else:
+        age = df[age_col]
+    age_codes = pediatric_age_group_codes(age, unit)
+    site_codes, sites = pd.factorize(df["HospitalSite"], sort=True)
+    n_sites = len(sites)
+    n_groups = len(PEDIATRIC_AGE_GROUPS) * n_sites
+
+    # Rows with no age group or site go to a spill-over key n_groups, dropped at the end
+    key = age_codes.astype(np.int64) * n_sites + site_codes
+    key[(age_codes < 0) | (site_codes < 0)] = n_groups
+    rows = np.bincount(key, minlength=n_groups + 1)[:n_groups]
+    pid_count = np.bincount(key, weights=df["PatientID"].notna().to_numpy(), minlength=n_groups + 1)[:n_groups]
 
+    los = pd.to_numeric(df["LengthOfStay"], errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+    missing_los = np.isnan(los)
+    los_key = np.where(missing_los, n_groups, key)
+    los = np.where(missing_los, 0.0, los)
+    los_n = np.bincount(los_key, minlength=n_groups + 1)[:n_groups]
+    los_sum = np.bincount(los_key, weights=los, minlength=n_groups + 1)[:n_groups]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        los_mean = np.where(los_n > 0, los_sum / los_n, np.nan)
+    los_median = _segment_medians(los_key, los, n_groups + 1)[:n_groups]
 
+    observed = np.flatnonzero(rows)
+    index = pd.MultiIndex.from_arrays([
+        pd.Categorical.from_codes(observed // n_sites, categories=PEDIATRIC_AGE_GROUPS, ordered=True),
+        sites[observed % n_sites],
+    ], names=["PediatricAgeGroup", "HospitalSite"])
+    return pd.DataFrame({
+        ("LengthOfStay", "mean"): los_mean[observed],
+        ("LengthOfStay", "median"): los_median[observed],
+        ("PatientID", "count"): pid_count[observed].astype(np.int64),
+    }, index=index).round(2)
+
+
+@instrument
 def calculate_clinical_flags(df: pd.DataFrame) -> pd.DataFrame:
     flags = pd.DataFrame({
         "PatientID": df["PatientID"],
@@ -71,20 +175,245 @@ def calculate_clinical_flags(df: pd.DataFrame) -> pd.DataFrame:
     readmit_counts = df.groupby("PatientID")["AdmissionDate"].transform("count")
     flags["FrequentReadmit"] = readmit_counts > 2
     # ComplexCase: needs LabTestCount; if missing, infer from columns
-    if "LabTestName_count" in df.columns:
-        lab_count = df["LabTestName_count"].fillna(0)
-    elif "LabTestCount" in df.columns:
-        lab_count = df["LabTestCount"].fillna(0)
-    else:
-        lab_count = pd.Series(0, index=df.index)
+    lab_count = _lab_test_count(df)
     flags["ComplexCase"] = lab_count > lab_count.quantile(0.9)
     return flags
 
+
+def _lab_test_count(df: pd.DataFrame) -> pd.Series:
+    """Per-row lab count used by ComplexCase (0 when the frame carries none)."""
+    if "LabTestName_count" in df.columns:
+        return df["LabTestName_count"].fillna(0)
+    if "LabTestCount" in df.columns:
+        return df["LabTestCount"].fillna(0)
+    return pd.Series(0, index=df.index)
+
+
+_INT64_MAX = np.iinfo(np.int64).max
+
+
+def _datetime_ints(*cols: pd.Series) -> list[np.ndarray]:
+    """Datetime-like columns as int64 ticks in their common unit (NaT -> int64 min)."""
+    vals = [pd.to_datetime(c, errors="coerce").to_numpy() for c in cols]
+    unit = np.result_type(*[v.dtype for v in vals])
+    return [v.astype(unit, copy=False).view(np.int64) for v in vals]
+
+
+@instrument
+def attribute_labs_to_admissions(labs: pd.DataFrame,
+                                 admissions: pd.DataFrame,
+                                 id_col: str = "PatientID",
+                                 lab_date_col: str = "CollectedDate",
+                                 admit_col: str = "AdmissionDate",
+                                 discharge_col: str = "DischargeDate",
+                                 key_col: str = "AdmissionKey") -> pd.DataFrame:
+    """Add `key_col` to labs: the admissions index label of the stay containing each lab.
+
+    A lab belongs to a stay when admit <= collected <= discharge (a missing discharge is
+    treated as still admitted). Both tables are sorted once and matched per patient with
+    merge_asof, so cost is O(n log n) rather than a PatientID merge plus date filter.
+    With overlapping stays the latest-starting containing stay wins, falling back to the
+    earlier stay with the latest discharge. Unmatched labs get <NA>.
+    """
+    start, stop, lab_t = _datetime_ints(admissions[admit_col], admissions[discharge_col], labs[lab_date_col])
+    adm = pd.DataFrame({
+        id_col: admissions[id_col].to_numpy(),
+        "_start": start,
+        "_stop": stop,
+        "_key": np.arange(len(admissions), dtype=np.int64),
+    })
+    nat = np.iinfo(np.int64).min
+    adm = adm[(adm["_start"] != nat) & adm[id_col].notna()]
+    adm.loc[adm["_stop"] == nat, "_stop"] = _INT64_MAX
+    adm = adm.sort_values([id_col, "_start"], kind="stable")
+    # Running max discharge per patient (and which stay holds it) catches a lab that falls
+    # inside a long earlier stay after a shorter later stay has already ended
+    adm["_cmax_stop"] = adm.groupby(id_col, sort=False)["_stop"].cummax()
+    holder = adm["_key"].where(adm["_stop"] == adm["_cmax_stop"])
+    adm["_cmax_key"] = holder.groupby(adm[id_col], sort=False).ffill()
+    adm = adm.sort_values("_start", kind="stable")
+
+    left = pd.DataFrame({id_col: labs[id_col].to_numpy(), "_t": lab_t, "_pos": np.arange(len(labs))})
+    left = left[(left["_t"] != nat) & left[id_col].notna()].sort_values("_t", kind="stable")
+    # merge_asof needs identical `by` dtypes; ids turn float upstream when any is missing
+    if adm[id_col].dtype != left[id_col].dtype and all(
+            pd.api.types.is_numeric_dtype(df[id_col]) for df in (adm, left)):
+        adm[id_col] = adm[id_col].astype(np.float64)
+        left[id_col] = left[id_col].astype(np.float64)
+    matched = pd.merge_asof(left, adm, left_on="_t", right_on="_start", by=id_col,
+                            direction="backward", allow_exact_matches=True)
+
+    t = matched["_t"].to_numpy()
+    own = (t <= matched["_stop"].to_numpy(dtype=float, na_value=-np.inf))
+    held = (t <= matched["_cmax_stop"].to_numpy(dtype=float, na_value=-np.inf))
+    pos = np.where(own, matched["_key"].to_numpy(dtype=float, na_value=np.nan),
+                   np.where(held, matched["_cmax_key"].to_numpy(dtype=float, na_value=np.nan), np.nan))
+
+    adm_pos = np.full(len(labs), -1, dtype=np.int64)
+    ok = ~np.isnan(pos)
+    adm_pos[matched["_pos"].to_numpy()[ok]] = pos[ok].astype(np.int64)
+    out = labs.copy()
+    if len(admissions):
+        keys = pd.Series(admissions.index.take(np.where(adm_pos >= 0, adm_pos, 0)), index=labs.index)
+    else:  # no stays to take labels from; every lab is unmatched
+        keys = pd.Series(np.nan, index=labs.index)
+    out[key_col] = keys.where(adm_pos >= 0)
+    if pd.api.types.is_integer_dtype(admissions.index.dtype):
+        out[key_col] = out[key_col].astype("Int64")
+    return out
+
+
+@instrument
+def admission_lab_summary(attributed_labs: pd.DataFrame,
+                          admissions: pd.DataFrame | None = None,
+                          key_col: str = "AdmissionKey",
+                          name_col: str = "LabTestName",
+                          value_col: str = "TestResultValue") -> pd.DataFrame:
+    """Per-admission lab aggregates from attribute_labs_to_admissions output.
+
+    Returns one row per AdmissionKey, or, when `admissions` is given, the admissions frame
+    with the aggregates joined on its index (admissions without labs get Lab_count 0).
+    """
+    labs = attributed_labs[attributed_labs[key_col].notna()]
+    summary = labs.groupby(key_col).agg(
+        Lab_count=(value_col, "size"),
+        LabTest_nunique=(name_col, "nunique"),
+        TestResultValue_mean=(value_col, "mean"),
+        TestResultValue_min=(value_col, "min"),
+        TestResultValue_max=(value_col, "max"),
+    )
+    if admissions is None:
+        return summary
+    out = admissions.join(summary, how="left")
+    out["Lab_count"] = out["Lab_count"].fillna(0).astype(int)
+    out["LabTest_nunique"] = out["LabTest_nunique"].fillna(0).astype(int)
+    return out
+
+
+def _overlapping_stays(pid: np.ndarray, admit: np.ndarray, disch: np.ndarray) -> np.ndarray:
+    """True where a stay starts before an earlier stay of the same patient has ended.
+
+    admit/disch are integer days (disch may be a large sentinel for open stays).
+    """
+    n = len(pid)
+    out = np.zeros(n, dtype=bool)
+    if n == 0:
+        return out
+    order = np.lexsort((admit, pid))
+    p, a, d = pid[order], admit[order], disch[order]
+    first = np.ones(n, dtype=bool)
+    first[1:] = p[1:] != p[:-1]
+    gid = np.cumsum(first) - 1
+    # Per-patient running max of discharge via one global cummax on group-offset values
+    lo = min(int(a.min()), int(d.min()))
+    span = int(max(int(a.max()), int(d.max())) - lo) + 1
+    shifted = (d - lo) + gid.astype(np.int64) * span
+    prev_max = np.maximum.accumulate(shifted) - gid.astype(np.int64) * span + lo
+    prev_max = np.concatenate(([lo - 1], prev_max[:-1]))
+    overlap = ~first & (a < prev_max)
+    out[order] = overlap
+    return out
+
+
+@instrument
+def daily_census(admissions: pd.DataFrame,
+                 site_col: str = "HospitalSite",
+                 admit_col: str = "AdmissionDate",
+                 discharge_col: str = "DischargeDate",
+                 id_col: str = "PatientID",
+                 window: int = 7,
+                 capacity: dict | None = None,
+                 start: str | pd.Timestamp | None = None,
+                 end: str | pd.Timestamp | None = None,
+                 with_overlaps: bool = False):
+    """Daily census, admissions and discharges per site from a difference array.
+
+    Each stay adds +1 on its admit day and -1 on its discharge day in a site x day array;
+    a cumulative sum gives the midnight census (admit <= day < discharge, so same-day stays
+    count as admissions/discharges but not census). Stays without a discharge stay open to
+    the end of the range; stays discharged before admission (see dq.validate_dates) add
+    nothing to the census. Cost is O(admissions + sites * days), independent of patient-days.
+
+    Returns a long frame (site, Date, Census, Admissions, Discharges, RollingCensus, plus
+    Occupancy/RollingOccupancy when `capacity` maps site -> beds). With with_overlaps=True
+    returns (census, overlaps) where overlaps is a boolean Series on admissions' index that
+    flags stays beginning before the same patient's previous stay ended.
+    """
+    admit_day = pd.to_datetime(admissions[admit_col], errors="coerce").to_numpy(dtype="datetime64[D]")
+    disch_day = pd.to_datetime(admissions[discharge_col], errors="coerce").to_numpy(dtype="datetime64[D]")
+    has_admit = ~np.isnat(admit_day)
+    has_disch = ~np.isnat(disch_day)
+    a = admit_day.astype(np.int64)
+    d = disch_day.astype(np.int64)
+
+    d0 = pd.Timestamp(start).to_datetime64().astype("datetime64[D]").astype(np.int64) if start is not None \
+        else (a[has_admit].min() if has_admit.any() else 0)
+    d1 = pd.Timestamp(end).to_datetime64().astype("datetime64[D]").astype(np.int64) if end is not None \
+        else max(a[has_admit].max() if has_admit.any() else d0, d[has_disch].max() if has_disch.any() else d0)
+    n_days = int(d1 - d0) + 1
+
+    site_codes, sites = pd.factorize(admissions[site_col], sort=True)
+    n_sites = len(sites)
+    ok = has_admit & (site_codes >= 0)
+    sc = site_codes[ok].astype(np.int64)
+    ai = a[ok] - d0
+    di = np.where(has_disch[ok], d[ok] - d0, n_days)
+
+    # Difference array with one spill column: +1 at admit, -1 at discharge, clipped to range
+    width = n_days + 1
+    diff = np.bincount(sc * width + np.clip(ai, 0, n_days), minlength=n_sites * width).astype(np.int64)
+    # An inverted stay becomes zero-length, so it cannot lower other patients' census
+    diff -= np.bincount(sc * width + np.clip(np.maximum(di, ai), 0, n_days), minlength=n_sites * width)
+    census = np.cumsum(diff.reshape(n_sites, width), axis=1)[:, :n_days]
+
+    def _daily_counts(idx: np.ndarray, mask: np.ndarray) -> np.ndarray:
+        keep = mask & (idx >= 0) & (idx < n_days)
+        return np.bincount(sc[keep] * n_days + idx[keep], minlength=n_sites * n_days).reshape(n_sites, n_days)
+
+    admits = _daily_counts(ai, np.ones(len(ai), dtype=bool))
+    discharges = _daily_counts(di, has_disch[ok])
+
+    # Trailing rolling mean (min_periods=1) from a prefix sum
+    cs = np.concatenate([np.zeros((n_sites, 1)), np.cumsum(census, axis=1, dtype=float)], axis=1)
+    t = np.arange(n_days)
+    lag = np.maximum(t + 1 - window, 0)
+    rolling = (cs[:, t + 1] - cs[:, lag]) / (t + 1 - lag)
+
+    out = pd.DataFrame({
+        site_col: np.repeat(np.asarray(sites), n_days),
+        "Date": np.tile((np.arange(n_days) + d0).astype("datetime64[D]"), n_sites).astype("datetime64[ns]"),
+        "Census": census.ravel(),
+        "Admissions": admits.ravel(),
+        "Discharges": discharges.ravel(),
+        "RollingCensus": rolling.ravel().round(2),
+    })
+    if capacity is not None:
+        beds = out[site_col].map(capacity).astype(float)
+        out["Occupancy"] = (out["Census"] / beds).round(4)
+        out["RollingOccupancy"] = (rolling.ravel() / beds).round(4)
+    if not with_overlaps:
+        return out
+
+    pid = pd.to_numeric(admissions[id_col], errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+    valid = has_admit & ~np.isnan(pid)
+    # Open stays end one day after the latest known date (keeps the cummax offsets small)
+    open_end = max(a[valid].max() if valid.any() else 0, d[has_disch].max() if has_disch.any() else 0) + 1
+    flags = np.zeros(len(admissions), dtype=bool)
+    flags[valid] = _overlapping_stays(pid[valid], a[valid], np.where(has_disch, d, open_end)[valid])
+    return out, pd.Series(flags, index=admissions.index, name="OverlapsPrevious")
+
 __all__ = [
     "multi_level_summary",
     "add_timeline_features",
     "high_risk_subset",
     "create_comprehensive_patient_view",
     "pediatric_analysis_by_age_group",
+    "pediatric_age_group_codes",
+    "age_at_admission_days",
+    "PEDIATRIC_AGE_GROUPS",
+    "PEDIATRIC_AGE_EDGES",
     "calculate_clinical_flags",
+    "attribute_labs_to_admissions",
+    "admission_lab_summary",
+    "daily_census",
 ]
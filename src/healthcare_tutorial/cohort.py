@@ -0,0 +1,311 @@
+from __future__ import annotations
+import numpy as np
+import pandas as pd
+from .analytics import PEDIATRIC_AGE_GROUPS, _lab_test_count, calculate_clinical_flags, pediatric_age_group_codes
+from .instrument import instrument
+
+# Bitmap cohort index: one packed bitset per attribute value, indexed by PatientID, so
+# cohort filters are word-wise AND/OR/NOT and counts are popcounts instead of rescans.
+#
+#   idx = CohortIndex.build(patients, admissions)
+#   c = idx.where(HospitalSite="CHEO", AgeGroup=["Infant", "Preschool"]) & ~idx.cohort("LongStay")
+#   c.count(); c.ids(); c.select(admissions)
+#
+# A patient is in a value's bitset if any of their rows (patients or admissions) has that
+# value; flags (LongStay, FrequentReadmit, ComplexCase) are "true for any admission".
+# PatientIDs must be non-negative integers, as for PatientIndex; rows without one are skipped.
+
+COHORT_ATTRIBUTES = ["HospitalSite", "DiagnosisName", "Gender", "AgeGroup"]
+FLAG_ATTRIBUTES = ["LongStay", "FrequentReadmit", "ComplexCase"]
+
+_POPCOUNT8 = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def _n_words(n_ids: int) -> int:
+    return (n_ids + 63) // 64
+
+
+def _popcount(words: np.ndarray) -> int:
+    if hasattr(np, "bitwise_count"):  # NumPy >= 2.0
+        return int(np.bitwise_count(words).sum(dtype=np.int64))
+    return int(_POPCOUNT8[words.view(np.uint8)].sum(dtype=np.int64))
+
+
+def _pack(ids: np.ndarray, n_words: int) -> np.ndarray:
+    """Bitset (uint64 words) with the bits of `ids` set."""
+    mask = np.zeros(n_words * 64, dtype=bool)
+    mask[ids] = True
+    # Bit i lives at byte i >> 3, bit i & 7 of the uint8 view on every platform
+    return np.packbits(mask, bitorder="little").view(np.uint64)
+
+
+def _pack_groups(codes: np.ndarray, ids: np.ndarray, n_groups: int, n_words: int):
+    """Yield (code, bitset) for each code in 0..n_groups-1 from parallel codes/ids arrays.
+
+    One sort by (code, word) and an OR-reduce per word, so building is
+    O(rows log rows + n_groups * n_words) instead of a full-width mask per code.
+    """
+    n_words = max(n_words, 1)
+    key = codes.astype(np.int64) * n_words + (ids >> 6)
+    order = np.argsort(key, kind="stable")
+    key = key[order]
+    bits = np.left_shift(np.uint64(1), (ids[order] & 63).astype(np.uint64))
+    starts = np.flatnonzero(np.r_[True, key[1:] != key[:-1]]) if len(key) else np.empty(0, np.int64)
+    word_bits = np.bitwise_or.reduceat(bits, starts) if len(key) else np.empty(0, np.uint64)
+    # Same byte layout as _pack: bit i at byte i >> 3 of the uint8 view
+    word_bits = word_bits.astype("<u8", copy=False).view(np.uint64)
+    group_code, group_word = np.divmod(key[starts], n_words)
+    bounds = np.searchsorted(group_code, np.arange(n_groups + 1))
+    for k in range(n_groups):
+        lo, hi = bounds[k], bounds[k + 1]
+        words = np.zeros(n_words, dtype=np.uint64)
+        words[group_word[lo:hi]] = word_bits[lo:hi]
+        yield k, words
+
+
+def _grow(words: np.ndarray, n_words: int) -> np.ndarray:
+    if len(words) >= n_words:
+        return words
+    return np.concatenate([words, np.zeros(n_words - len(words), dtype=np.uint64)])
+
+
+def _with_ids(df: pd.DataFrame, id_col: str) -> pd.DataFrame:
+    """Rows that have a PatientID; rows without one belong to no patient."""
+    present = df[id_col].notna()
+    return df if present.all() else df[present.to_numpy()]
+
+
+def _patient_ids(df: pd.DataFrame, id_col: str) -> np.ndarray:
+    pid = pd.to_numeric(df[id_col], errors="coerce")
+    if pid.isna().any():
+        raise ValueError(f"{id_col} has non-numeric values")
+    ids = pid.to_numpy(dtype=np.int64)
+    if len(ids) and ids.min() < 0:
+        raise ValueError(f"{id_col} must be non-negative")
+    return ids
+
+
+class Cohort:
+    """A set of patients as a bitset; combine with &, |, - and ~.
+
+    Nothing is materialized until ids(), mask() or select() is called.
+    """
+
+    __slots__ = ("index", "words", "_ids")
+
+    def __init__(self, index: "CohortIndex", words: np.ndarray):
+        self.index = index
+        self.words = words
+        self._ids = None
+
+    def _pair(self, other: "Cohort") -> tuple[np.ndarray, np.ndarray]:
+        # Cohorts taken before add_patients() are shorter; missing words are empty
+        n = max(len(self.words), len(other.words))
+        return _grow(self.words, n), _grow(other.words, n)
+
+    def __and__(self, other: "Cohort") -> "Cohort":
+        a, b = self._pair(other)
+        return Cohort(self.index, a & b)
+
+    def __or__(self, other: "Cohort") -> "Cohort":
+        a, b = self._pair(other)
+        return Cohort(self.index, a | b)
+
+    def __sub__(self, other: "Cohort") -> "Cohort":
+        a, b = self._pair(other)
+        return Cohort(self.index, a & ~b)
+
+    def __invert__(self) -> "Cohort":
+        # Complement within the known patients; this also keeps the unused tail bits clear
+        universe = self.index.universe
+        return Cohort(self.index, universe & ~_grow(self.words, len(universe)))
+
+    def count(self) -> int:
+        return _popcount(self.words)
+
+    def __len__(self) -> int:
+        return self.count()
+
+    def mask(self) -> np.ndarray:
+        """Boolean membership array indexed by PatientID."""
+        return np.unpackbits(self.words.view(np.uint8), bitorder="little").view(bool)
+
+    def ids(self) -> np.ndarray:
+        """Sorted PatientIDs in the cohort (computed once)."""
+        if self._ids is None:
+            self._ids = np.flatnonzero(self.mask())
+        return self._ids
+
+    def contains(self, patient_ids) -> np.ndarray:
+        """Vectorized membership test for an array of PatientIDs."""
+        ids = np.asarray(patient_ids, dtype=np.int64)
+        data = self.words.view(np.uint8)
+        ok = (ids >= 0) & (ids < len(data) * 8)
+        out = np.zeros(len(ids), dtype=bool)
+        sel = ids[ok]
+        out[ok] = (data[sel >> 3] >> (sel & 7).astype(np.uint8)) & 1 == 1
+        return out
+
+    def select(self, df: pd.DataFrame, id_col: str | None = None) -> pd.DataFrame:
+        """Rows of `df` whose patient is in the cohort (rows without a PatientID never are)."""
+        id_col = id_col or self.index.id_col
+        present = df[id_col].notna().to_numpy()
+        keep = np.zeros(len(df), dtype=bool)
+        keep[present] = self.contains(_patient_ids(df[present], id_col))
+        return df[keep]
+
+    def __repr__(self) -> str:
+        return f"Cohort({self.count()} patients)"
+
+
+class CohortIndex:
+    """Packed bitsets per (attribute, value) over PatientID, updatable in place."""
+
+    def __init__(self, bitmaps: dict[str, dict], universe: np.ndarray, id_col: str = "PatientID",
+                 attributes: list[str] | None = None, admit_counts: np.ndarray | None = None,
+                 complex_threshold: float = 0.0):
+        self.bitmaps = bitmaps
+        self.universe = universe
+        self.id_col = id_col
+        self.indexed = list(attributes or COHORT_ATTRIBUTES)
+        # State kept so add_patients() can update the flags without the old rows
+        self.admit_counts = np.zeros(0, dtype=np.int64) if admit_counts is None else admit_counts
+        self.complex_threshold = complex_threshold
+
+    @classmethod
+    @instrument(name="cohort.CohortIndex.build")
+    def build(cls, patients: pd.DataFrame | None = None, admissions: pd.DataFrame | None = None,
+              id_col: str = "PatientID", attributes: list[str] | None = None) -> "CohortIndex":
+        """Index `attributes` (default COHORT_ATTRIBUTES) plus the clinical flags.
+
+        AgeGroup is derived from an Age column (years) with pediatric_age_group_codes; the
+        flags come from calculate_clinical_flags(admissions) when admissions has
+        LengthOfStay and AdmissionDate.
+        """
+        index = cls({}, np.zeros(0, dtype=np.uint64), id_col, attributes)
+        if admissions is not None and {"LengthOfStay", "AdmissionDate"} <= set(admissions.columns):
+            flags = calculate_clinical_flags(admissions)
+            index.complex_threshold = float(_lab_test_count(admissions).quantile(0.9))
+            index._update(patients, admissions, flags)
+        else:
+            index._update(patients, admissions, None)
+        return index
+
+    @instrument(name="cohort.CohortIndex.add_patients")
+    def add_patients(self, patients: pd.DataFrame | None = None,
+                     admissions: pd.DataFrame | None = None) -> "CohortIndex":
+        """Set bits for newly arrived patients and admissions; existing bits are kept.
+
+        FrequentReadmit uses running admission counts per patient and ComplexCase reuses the
+        lab-count threshold fixed at build time, so flags match a rebuild on the union
+        except for that threshold.
+        """
+        flags = None
+        if admissions is not None and {"LengthOfStay", "AdmissionDate"} <= set(admissions.columns):
+            flags = pd.DataFrame({
+                self.id_col: admissions[self.id_col],
+                "LongStay": admissions["LengthOfStay"] > 7,
+                "ComplexCase": _lab_test_count(admissions) > self.complex_threshold,
+            })
+        self._update(patients, admissions, flags)
+        return self
+
+    def _set(self, attr: str, ids: np.ndarray, values) -> None:
+        values = pd.Series(values)
+        present = values.notna().to_numpy()
+        codes, uniques = pd.factorize(values[present])
+        ids = ids[present]
+        n_words = len(self.universe)
+        table = self.bitmaps.setdefault(attr, {})
+        for k, bits in _pack_groups(codes, ids, len(uniques), n_words):
+            value = uniques[k]
+            old = table.get(value)
+            table[value] = bits if old is None else _grow(old, n_words) | bits
+
+    def _update(self, patients, admissions, flags) -> None:
+        patients, admissions, flags = (None if df is None else _with_ids(df, self.id_col)
+                                       for df in (patients, admissions, flags))
+        frames = [df for df in (patients, admissions) if df is not None]
+        ids = [_patient_ids(df, self.id_col) for df in frames]
+        n_ids = 1 + max((int(a.max()) for a in ids if len(a)), default=-1)
+        n_words = max(_n_words(n_ids), len(self.universe))
+        self.universe = _grow(self.universe, n_words)
+        for a in ids:
+            self.universe |= _pack(a, n_words)
+
+        for df, pid in zip(frames, ids):
+            for attr in self.indexed:
+                if attr == "AgeGroup" and "Age" in df.columns:
+                    codes = pediatric_age_group_codes(df["Age"], unit="years")
+                    names = np.array(PEDIATRIC_AGE_GROUPS + [None], dtype=object)[codes]
+                    self._set(attr, pid, names)
+                elif attr in df.columns:
+                    self._set(attr, pid, df[attr].to_numpy())
+
+        if admissions is not None:
+            adm_ids = ids[-1]
+            counts = np.bincount(adm_ids, minlength=len(self.admit_counts))
+            self.admit_counts = np.pad(self.admit_counts, (0, len(counts) - len(self.admit_counts))) + counts
+        if flags is not None:
+            flag_ids = _patient_ids(flags, self.id_col)
+            for attr in ("LongStay", "ComplexCase"):
+                self._set(attr, flag_ids[flags[attr].to_numpy(dtype=bool)], np.full(int(flags[attr].sum()), True))
+            frequent = np.flatnonzero(self.admit_counts > 2)
+            self._set("FrequentReadmit", frequent, np.full(len(frequent), True))
+
+    @property
+    def n_ids(self) -> int:
+        """Capacity of the bitsets (one past the largest addressable PatientID)."""
+        return len(self.universe) * 64
+
+    @property
+    def attributes(self) -> list[str]:
+        return list(self.bitmaps)
+
+    def values(self, attr: str) -> list:
+        return list(self.bitmaps[attr])
+
+    def all(self) -> Cohort:
+        """Every patient seen so far."""
+        return Cohort(self, self.universe)
+
+    def cohort(self, attr: str, *values) -> Cohort:
+        """Patients with any of `values` for `attr` (flags need no value)."""
+        table = self.bitmaps.get(attr)
+        if table is None:
+            raise KeyError(f"attribute {attr!r} is not indexed")
+        if not values:
+            values = (True,) if attr in FLAG_ATTRIBUTES else tuple(table)
+        words = np.zeros(len(self.universe), dtype=np.uint64)
+        for v in values:
+            bits = table.get(v)
+            if bits is not None:
+                words |= _grow(bits, len(words))
+        return Cohort(self, words)
+
+    def where(self, **criteria) -> Cohort:
+        """AND across attributes; a list value means OR within that attribute.
+
+        idx.where(HospitalSite=["CHEO", "HSC"], Gender="F", LongStay=True)
+        """
+        result = self.all()
+        for attr, value in criteria.items():
+            values = value if isinstance(value, (list, tuple, set)) else [value]
+            if attr in FLAG_ATTRIBUTES and values == [False]:
+                result = result - self.cohort(attr)
+            else:
+                result = result & self.cohort(attr, *values)
+        return result
+
+    def counts(self, attr: str) -> pd.Series:
+        """Patients per value of `attr` (popcounts only)."""
+        table = self.bitmaps[attr]
+        return pd.Series({v: _popcount(bits) for v, bits in table.items()}, name="Patients")
+
+
+__all__ = [
+    "COHORT_ATTRIBUTES",
+    "FLAG_ATTRIBUTES",
+    "Cohort",
+    "CohortIndex",
+]
@@ -46,43 +46,39 @@ def make_patients(cfg: SyntheticConfig) -> pd.DataFrame:
 def make_admissions(patients: pd.DataFrame, cfg: SyntheticConfig) -> pd.DataFrame:
     start = pd.to_datetime(cfg.start_date)
     end = pd.to_datetime(cfg.end_date)
-    rows = []
-    for pid in patients["PatientID"]:
-        n = max(1, int(rng.poisson(cfg.n_admissions_mean)))
-        ad_dates = _random_dates(n, start, end).sort_values().to_list()
-        for ad in ad_dates:
-            los = int(max(0, rng.normal(3, 2)))  # mean ~3 days
-            disch = ad + timedelta(days=los)
-            rows.append({
-                "PatientID": pid,
-                "AdmissionDate": ad,
-                "DischargeDate": disch,
-                "LengthOfStay": (disch - ad).days,
-                "HospitalSite": rng.choice(HOSPITAL_SITES),
-            })
-    return pd.DataFrame(rows)
+    pids = patients["PatientID"].to_numpy()
+    n = np.maximum(1, rng.poisson(cfg.n_admissions_mean, size=len(pids)))
+    pid = np.repeat(pids, n)
+    admit = _random_dates(len(pid), start, end).to_numpy()
+    admit = admit[np.lexsort((admit, pid))]  # sorted by date within each patient
+    los = np.maximum(0, np.trunc(rng.normal(3, 2, size=len(pid)))).astype(np.int64)  # mean ~3 days
+    admit = pd.to_datetime(admit)
+    return pd.DataFrame({
+        "PatientID": pid,
+        "AdmissionDate": admit,
+        "DischargeDate": admit + pd.to_timedelta(los, unit="D"),
+        "LengthOfStay": los,
+        "HospitalSite": rng.choice(HOSPITAL_SITES, size=len(pid)),
+    })
+
+# Lab value distributions (mean, sd); Hemoglobin in g/L
+LAB_VALUE_PARAMS = {"Glucose": (5.5, 1.2), "Sodium": (140, 3), "Hemoglobin": (130, 15)}
 
 def make_labs(patients: pd.DataFrame, cfg: SyntheticConfig) -> pd.DataFrame:
     start = pd.to_datetime(cfg.start_date)
     end = pd.to_datetime(cfg.end_date)
-    rows = []
-    for pid in patients["PatientID"]:
-        n = max(0, int(rng.poisson(cfg.lab_tests_per_patient_mean)))
-        for _ in range(n):
-            test = rng.choice(LABS)
-            if test == "Glucose":
-                val = rng.normal(5.5, 1.2)
-            elif test == "Sodium":
-                val = rng.normal(140, 3)
-            else:  # Hemoglobin (g/L)
-                val = rng.normal(130, 15)
-            rows.append({
-                "PatientID": pid,
-                "LabTestName": test,
-                "TestResultValue": float(np.round(val, 1)),
-                "CollectedDate": _random_dates(1, start, end)[0],
-            })
-    return pd.DataFrame(rows)
+    pids = patients["PatientID"].to_numpy()
+    n = np.maximum(0, rng.poisson(cfg.lab_tests_per_patient_mean, size=len(pids)))
+    pid = np.repeat(pids, n)
+    test = rng.integers(0, len(LABS), size=len(pid))
+    mean = np.array([LAB_VALUE_PARAMS[t][0] for t in LABS], dtype=float)[test]
+    sd = np.array([LAB_VALUE_PARAMS[t][1] for t in LABS], dtype=float)[test]
+    return pd.DataFrame({
+        "PatientID": pid,
+        "LabTestName": np.asarray(LABS, dtype=object)[test],
+        "TestResultValue": np.round(rng.normal(mean, sd), 1),
+        "CollectedDate": _random_dates(len(pid), start, end),
+    })
 
 __all__ = [
     "SyntheticConfig",
@@ -1,9 +1,13 @@
 from __future__ import annotations
+import json
+import os
 import pandas as pd
 import numpy as np
+from .instrument import instrument
 
 # Data quality and validation helpers
 
+@instrument
 def comprehensive_data_profile(df: pd.DataFrame) -> dict:
     """Complete data quality assessment summary."""
     return {
@@ -15,6 +19,7 @@ def comprehensive_data_profile(df: pd.DataFrame) -> dict:
         "memory_usage_bytes": int(df.memory_usage(deep=True).sum()),
     }
 
+@instrument
 def validate_pediatric_ages(df: pd.DataFrame, age_col: str = "Age") -> pd.DataFrame:
     """Return boolean flags for pediatric-specific age validation."""
     flags = pd.DataFrame(index=df.index)
@@ -29,6 +34,7 @@ LAB_RANGES = {
     "Hemoglobin": (110, 160) # g/L
 }
 
+@instrument
 def validate_lab_ranges(labs_df: pd.DataFrame,
                          name_col: str = "LabTestName",
                          value_col: str = "TestResultValue") -> pd.DataFrame:
@@ -41,6 +47,7 @@ def validate_lab_ranges(labs_df: pd.DataFrame,
     flags["unknown_test"] = ~labs_df[name_col].isin(LAB_RANGES.keys())
     return flags
 
+@instrument
 def validate_dates(adm_df: pd.DataFrame,
                    admit_col: str = "AdmissionDate",
                    discharge_col: str = "DischargeDate") -> pd.DataFrame:
@@ -52,6 +59,7 @@ def validate_dates(adm_df: pd.DataFrame,
     return flags
 
 
+@instrument
 def validate_length_of_stay_consistency(adm_df: pd.DataFrame,
                                         admit_col: str = "AdmissionDate",
                                         discharge_col: str = "DischargeDate",
@@ -64,6 +72,7 @@ def validate_length_of_stay_consistency(adm_df: pd.DataFrame,
     return flags
 
 
+@instrument
 def validate_gender_codes(df: pd.DataFrame,
                           gender_col: str = "Gender",
                           allowed: tuple[str, ...] = ("M", "F")) -> pd.DataFrame:
@@ -76,6 +85,7 @@ def validate_gender_codes(df: pd.DataFrame,
     return flags
 
 
+@instrument
 def validate_icd10_format(df: pd.DataFrame,
                           code_col: str = "DiagnosisCode") -> pd.DataFrame:
     """Basic ICD-10 code format check (not clinical validation).
@@ -94,6 +104,7 @@ def validate_icd10_format(df: pd.DataFrame,
     return flags
 
 
+@instrument
 def cross_table_consistency(patients: pd.DataFrame,
                             admissions: pd.DataFrame,
                             labs: pd.DataFrame,
@@ -110,6 +121,202 @@ def cross_table_consistency(patients: pd.DataFrame,
         "patients_missing_labs": int(len(pid_pat - pid_lab)),
     }
 
+
+# Incremental DQ: rules run only on rows past a persisted watermark and per-rule counts
+# accumulate in a state directory, so nightly cost follows the new rows. Tables are
+# assumed append-only (rows already validated never change).
+#
+#   report = incremental_dq(patients, admissions, labs, state_dir="dq_state")
+#   report.loc["admissions"]  # delta and cumulative flag counts per rule
+
+INCREMENTAL_RULES = {
+    "patients": [validate_pediatric_ages, validate_gender_codes, validate_icd10_format],
+    "admissions": [validate_dates, validate_length_of_stay_consistency],
+    "labs": [validate_lab_ranges],
+}
+WATERMARK_DATE_COLS = {"admissions": "AdmissionDate", "labs": "CollectedDate"}
+# Sorted id arrays kept between runs: known patients, patients with an admission / a lab,
+# and the PatientID of every admission / lab row whose patient is still unknown
+_ID_SETS = ("patients", "admitted", "tested", "admission_orphans", "lab_orphans")
+
+
+def _load_dq_state(state_dir: str) -> tuple[dict, dict[str, np.ndarray]]:
+    path = os.path.join(state_dir, "state.json")
+    if not os.path.exists(path):
+        return {"tables": {}, "counts": {}}, {k: np.empty(0, dtype=np.int64) for k in _ID_SETS}
+    with open(path) as f:
+        state = json.load(f)
+    return state, {k: np.load(os.path.join(state_dir, f"{k}.npy")) for k in _ID_SETS}
+
+
+def _save_dq_state(state_dir: str, state: dict, ids: dict[str, np.ndarray]) -> None:
+    # Write temporaries, then swap them in with state.json last
+    os.makedirs(state_dir, exist_ok=True)
+    for k, arr in ids.items():
+        np.save(os.path.join(state_dir, f"{k}.tmp.npy"), arr)
+    with open(os.path.join(state_dir, "state.json.tmp"), "w") as f:
+        json.dump(state, f, indent=2)
+    for k in ids:
+        os.replace(os.path.join(state_dir, f"{k}.tmp.npy"), os.path.join(state_dir, f"{k}.npy"))
+    os.replace(os.path.join(state_dir, "state.json.tmp"), os.path.join(state_dir, "state.json"))
+
+
+def _new_rows(df: pd.DataFrame, table: str, mark: dict, watermark: str) -> tuple[pd.DataFrame, dict, int | None]:
+    """Rows past the table's row watermark, the watermark to store after this run and,
+    for watermark="date", how many of those rows are dated before the stored max date.
+
+    New rows are always selected by position (tables are append-only), so late-arriving
+    rows are validated too; the date watermark only tracks and reports them.
+    """
+    seen = int(mark.get("rows", 0))
+    if len(df) < seen:
+        raise ValueError(f"{table}: {len(df)} rows but {seen} were already validated; "
+                         "tables must be append-only (reset the DQ state after a reload)")
+    new = df.iloc[seen:]
+    date_col = WATERMARK_DATE_COLS.get(table)
+    if watermark == "row" or date_col not in df.columns:
+        return new, {"rows": len(df)}, None
+    dates = pd.to_datetime(new[date_col], errors="coerce")
+    last = pd.Timestamp(mark["max_date"]) if mark.get("max_date") else None
+    late = int((dates < last).sum()) if last is not None else 0
+    top = dates.max()
+    if last is not None and (pd.isna(top) or top < last):
+        top = last
+    return new, {"rows": len(df), "max_date": None if pd.isna(top) else top.isoformat()}, late
+
+
+# Stands in for a missing PatientID in orphan arrays: it never matches a patient, so such
+# rows stay "unknown patient" as they do in cross_table_consistency
+_MISSING_ID = np.iinfo(np.int64).min
+
+
+def _ids(df: pd.DataFrame, id_col: str, keep_missing: bool = False) -> np.ndarray:
+    if id_col not in df.columns:
+        return np.empty(0, dtype=np.int64)
+    pid = pd.to_numeric(df[id_col], errors="coerce")
+    pid = pid.fillna(_MISSING_ID) if keep_missing else pid.dropna()
+    return pid.to_numpy(dtype=np.int64)
+
+
+def _in_sorted(values: np.ndarray, sorted_ids: np.ndarray) -> np.ndarray:
+    pos = np.searchsorted(sorted_ids, values)
+    return (pos < len(sorted_ids)) & (sorted_ids[np.minimum(pos, len(sorted_ids) - 1)] == values) \
+        if len(sorted_ids) else np.zeros(len(values), dtype=bool)
+
+
+def _merge_sorted_all(sorted_ids: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """sorted_ids with every value of `values` inserted, duplicates kept."""
+    values = np.sort(values)
+    return np.insert(sorted_ids, np.searchsorted(sorted_ids, values), values)
+
+
+def _merge_sorted(sorted_ids: np.ndarray, values: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """sorted_ids with the unseen `values` inserted (no re-sort), and those unseen values."""
+    values = np.unique(values)
+    unseen = values[~_in_sorted(values, sorted_ids)]
+    return np.insert(sorted_ids, np.searchsorted(sorted_ids, unseen), unseen), unseen
+
+
+@instrument
+def incremental_dq(patients: pd.DataFrame,
+                   admissions: pd.DataFrame,
+                   labs: pd.DataFrame,
+                   state_dir: str,
+                   watermark: str = "row",
+                   id_col: str = "PatientID",
+                   rules: dict | None = None,
+                   commit: bool = True) -> pd.DataFrame:
+    """Validate only rows past the stored watermark and update running counts.
+
+    watermark: "row" (append order) or "date", which selects the same rows but also tracks
+    the max AdmissionDate / CollectedDate and reports new rows dated before it as
+    `late_rows`.
+    rules: table -> validators (default INCREMENTAL_RULES); each flag column is a rule.
+    commit: persist the new watermark and counts (False for a dry run).
+
+    Referential checks look up only the new ids: new admission/lab rows against the known
+    patients, and new patients against stored orphans, which they resolve. Returns a frame
+    indexed by (table, rule) with `delta` (this run) and `cumulative` counts; cumulative
+    "cross_table" rows match cross_table_consistency on the full tables (plus a running
+    count of orphans resolved by late-arriving patients).
+    """
+    if watermark not in ("row", "date"):
+        raise ValueError("watermark must be 'row' or 'date'")
+    rules = INCREMENTAL_RULES if rules is None else rules
+    state, ids = _load_dq_state(state_dir)
+    tables = {"patients": patients, "admissions": admissions, "labs": labs}
+    counts = {t: dict(c) for t, c in state["counts"].items()}
+    delta: dict[tuple[str, str], int] = {}
+
+    marks, new = {}, {}
+    for name, df in tables.items():
+        new[name], marks[name], late = _new_rows(df, name, state["tables"].get(name, {}), watermark)
+        delta[(name, "rows_checked")] = len(new[name])
+        if late is not None:
+            delta[(name, "late_rows")] = late
+        if not len(new[name]):
+            continue  # nothing to validate; rule counts carry over with a delta of 0
+        for rule in rules.get(name, []):
+            flags = rule(new[name])
+            for col in flags.columns:
+                delta[(name, col)] = int(flags[col].sum())
+
+    new_adm, new_lab = _ids(new["admissions"], id_col), _ids(new["labs"], id_col)
+    adm_rows, lab_rows = _ids(new["admissions"], id_col, True), _ids(new["labs"], id_col, True)
+    known, new_pat = _merge_sorted(ids["patients"], _ids(new["patients"], id_col))
+    admitted, new_admitted = _merge_sorted(ids["admitted"], new_adm)
+    tested, new_tested = _merge_sorted(ids["tested"], new_lab)
+    # Orphans from earlier runs whose patient has now arrived are resolved
+    adm_orphans = ids["admission_orphans"][~_in_sorted(ids["admission_orphans"], new_pat)]
+    lab_orphans = ids["lab_orphans"][~_in_sorted(ids["lab_orphans"], new_pat)]
+    adm_new_orphans = adm_rows[~_in_sorted(adm_rows, known)]
+    lab_new_orphans = lab_rows[~_in_sorted(lab_rows, known)]
+    new_ids = {
+        "patients": known,
+        "admitted": admitted,
+        "tested": tested,
+        "admission_orphans": _merge_sorted_all(adm_orphans, adm_new_orphans),
+        "lab_orphans": _merge_sorted_all(lab_orphans, lab_new_orphans),
+    }
+
+    # Patients without admissions/labs, updated from the new ids only: new patients not
+    # yet seen in that table are added, previously known patients seen for the first time
+    # are removed
+    prev = state["counts"].get("cross_table", {})
+    missing_adm = (int((~_in_sorted(new_pat, admitted)).sum())
+                   - int(_in_sorted(new_admitted, ids["patients"]).sum()))
+    missing_lab = (int((~_in_sorted(new_pat, tested)).sum())
+                   - int(_in_sorted(new_tested, ids["patients"]).sum()))
+    resolved = (len(ids["admission_orphans"]) - len(adm_orphans)
+                + len(ids["lab_orphans"]) - len(lab_orphans))
+    delta[("cross_table", "admissions_with_unknown_patient")] = len(adm_new_orphans)
+    delta[("cross_table", "labs_with_unknown_patient")] = len(lab_new_orphans)
+    delta[("cross_table", "patients_missing_admissions")] = missing_adm
+    delta[("cross_table", "patients_missing_labs")] = missing_lab
+    delta[("cross_table", "resolved_unknown_patient")] = resolved
+
+    for (table, rule), n in delta.items():
+        if table != "cross_table":
+            counts.setdefault(table, {})[rule] = counts.get(table, {}).get(rule, 0) + n
+    # Orphan counts are what is still outstanding, not a sum of deltas
+    counts["cross_table"] = {
+        "admissions_with_unknown_patient": len(new_ids["admission_orphans"]),
+        "labs_with_unknown_patient": len(new_ids["lab_orphans"]),
+        "patients_missing_admissions": prev.get("patients_missing_admissions", 0) + missing_adm,
+        "patients_missing_labs": prev.get("patients_missing_labs", 0) + missing_lab,
+        "resolved_unknown_patient": prev.get("resolved_unknown_patient", 0) + resolved,
+    }
+
+    if commit:
+        state = {"watermark": watermark, "tables": marks, "counts": counts,
+                 "runs": int(state.get("runs", 0)) + 1}
+        _save_dq_state(state_dir, state, new_ids)
+
+    rows = [(t, r, delta.get((t, r), 0), c) for t, rc in counts.items() for r, c in rc.items()]
+    report = pd.DataFrame(rows, columns=["table", "rule", "delta", "cumulative"])
+    return report.set_index(["table", "rule"])
+
+
 __all__ = [
     "comprehensive_data_profile",
     "validate_pediatric_ages",
@@ -119,5 +326,8 @@ __all__ = [
     "validate_gender_codes",
     "validate_icd10_format",
     "cross_table_consistency",
+    "incremental_dq",
+    "INCREMENTAL_RULES",
     "LAB_RANGES",
 ]
+
@@ -1,6 +1,7 @@
 from __future__ import annotations
 import os
 import pandas as pd
+from .instrument import instrument
 
 
 def ensure_output_dir(path: str) -> str:
@@ -8,6 +9,7 @@ def ensure_output_dir(path: str) -> str:
     return path
 
 
+@instrument
 def simple_cleaning(df: pd.DataFrame, dropna_cols: list[str] | None = None,
                     numeric_coerce: list[str] | None = None) -> pd.DataFrame:
     out = df.copy()
@@ -20,6 +22,7 @@ def simple_cleaning(df: pd.DataFrame, dropna_cols: list[str] | None = None,
     return out
 
 
+@instrument
 def iqr_outlier_flags(series: pd.Series, k: float = 1.5) -> pd.Series:
     q1 = series.quantile(0.25)
     q3 = series.quantile(0.75)
@@ -29,6 +32,7 @@ def iqr_outlier_flags(series: pd.Series, k: float = 1.5) -> pd.Series:
     return (series < lo) | (series > hi)
 
 
+@instrument
 def build_star_schema(patients: pd.DataFrame,
                       admissions: pd.DataFrame,
                       labs: pd.DataFrame) -> dict[str, pd.DataFrame]:
@@ -0,0 +1,175 @@
+from __future__ import annotations
+import json
+import os
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+import numpy as np
+import pandas as pd
+from .instrument import instrument
+
+# Sparse per-patient lab features. Patients and lab names become integer codes, the labs
+# are sorted once by (patient, test, date) and every statistic is a reduceat over the
+# group boundaries, written straight into CSR arrays: no pivot_table, no dense NaN frame.
+#
+#   feats = build_lab_features(labs, patient_ids=admissions["PatientID"], top_k=500)
+#   X_tab = build_cleaning_pipeline(num, cat).fit_transform(admissions[num + cat])
+#   X = hstack_features(X_tab, feats.align(admissions["PatientID"]))
+#
+# scipy is imported inside the functions that need it to keep imports cheap.
+if TYPE_CHECKING:
+    from scipy.sparse import csr_matrix
+
+LAB_FEATURE_STATS = ("latest", "min", "max", "mean", "count")
+
+
+@dataclass
+class LabFeatures:
+    """CSR matrix with one row per patient and one column per (lab test, statistic).
+
+    Tests a patient never had are implicit zeros; the `count` column tells a measured 0
+    apart from a missing test.
+    """
+    matrix: csr_matrix
+    patient_ids: np.ndarray
+    lab_names: np.ndarray
+    stats: tuple[str, ...] = LAB_FEATURE_STATS
+
+    @property
+    def feature_names(self) -> list[str]:
+        return [f"{name}_{stat}" for name in self.lab_names for stat in self.stats]
+
+    def rows_for(self, patient_ids) -> np.ndarray:
+        """Row position of each PatientID (-1 when the patient has no labs)."""
+        return pd.Index(self.patient_ids).get_indexer(np.asarray(patient_ids))
+
+    def align(self, patient_ids) -> csr_matrix:
+        """Rows in the order of `patient_ids` (repeats allowed, unknown ids -> empty rows)."""
+        from scipy.sparse import csr_matrix
+        m = self.matrix
+        n_rows, n_cols = m.shape
+        # Point unknown ids at an extra empty row appended without copying the data
+        padded = csr_matrix((m.data, m.indices, np.append(m.indptr, m.indptr[-1])), shape=(n_rows + 1, n_cols))
+        rows = self.rows_for(patient_ids)
+        return padded[np.where(rows >= 0, rows, n_rows)]
+
+    def save(self, path: str) -> str:
+        """Write the CSR arrays as .npy files (loadable memory-mapped) plus meta.json."""
+        os.makedirs(path, exist_ok=True)
+        m = self.matrix
+        for name, arr in (("data", m.data), ("indices", m.indices), ("indptr", m.indptr),
+                          ("patient_ids", self.patient_ids)):
+            np.save(os.path.join(path, f"{name}.npy"), arr)
+        with open(os.path.join(path, "meta.json"), "w") as f:
+            json.dump({"shape": list(m.shape), "stats": list(self.stats),
+                       "lab_names": [str(n) for n in self.lab_names]}, f)
+        return path
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> "LabFeatures":
+        """Open saved features; with mmap=True the CSR arrays stay on disk until touched."""
+        from scipy.sparse import csr_matrix
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        mode = "r" if mmap else None
+        arrays = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mode)
+                  for name in ("data", "indices", "indptr", "patient_ids")}
+        matrix = csr_matrix((arrays["data"], arrays["indices"], arrays["indptr"]),
+                            shape=tuple(meta["shape"]), copy=False)
+        return cls(matrix, arrays["patient_ids"], np.array(meta["lab_names"], dtype=object), tuple(meta["stats"]))
+
+
+@instrument
+def build_lab_features(labs: pd.DataFrame,
+                       patient_ids=None,
+                       top_k: int | None = None,
+                       stats: tuple[str, ...] = LAB_FEATURE_STATS,
+                       id_col: str = "PatientID",
+                       test_col: str = "LabTestName",
+                       value_col: str = "TestResultValue",
+                       date_col: str | None = "CollectedDate") -> LabFeatures:
+    """Aggregate labs into a sparse patient x (test, stat) matrix in one sorted pass.
+
+    patient_ids: rows to produce (duplicates and missing ids ignored); default is every
+    patient in labs. Labs without a PatientID are dropped.
+    top_k: keep only the k most frequent tests (ties broken by name).
+    stats: any of latest, min, max, mean, count; "latest" uses date_col (file order if None).
+    """
+    from scipy.sparse import csr_matrix
+    unknown = set(stats) - set(LAB_FEATURE_STATS)
+    if unknown:
+        raise ValueError(f"unknown stats: {sorted(unknown)}")
+
+    values = pd.to_numeric(labs[value_col], errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+    keep = ~np.isnan(values) & labs[id_col].notna().to_numpy()  # a lab without a patient has no row
+    tests, names = pd.factorize(labs[test_col].to_numpy()[keep], sort=True)
+    pids = labs[id_col].to_numpy()[keep]
+    values = values[keep]
+    if date_col is not None and date_col in labs.columns:
+        when = pd.to_datetime(labs[date_col], errors="coerce").to_numpy()[keep].view(np.int64)
+    else:
+        when = np.arange(len(values), dtype=np.int64)
+
+    if top_k is not None and top_k < len(names):
+        freq = np.bincount(tests[tests >= 0], minlength=len(names))
+        top = np.sort(np.argsort(-freq, kind="stable")[:top_k])
+        remap = np.full(len(names), -1, dtype=np.int64)
+        remap[top] = np.arange(len(top))
+        tests = np.where(tests >= 0, remap[tests], -1)
+        names = names[top]
+
+    row_ids = pd.unique(pd.Series(patient_ids if patient_ids is not None else pids).dropna()).astype(np.int64, copy=False)
+    if patient_ids is None:
+        row_ids = np.sort(row_ids)
+    rows = pd.Index(row_ids).get_indexer(pids)
+    ok = (rows >= 0) & (tests >= 0)
+    rows, tests, values, when = rows[ok], tests[ok], values[ok], when[ok]
+
+    n_tests, n_stats = len(names), len(stats)
+    key = rows.astype(np.int64) * n_tests + tests
+    order = np.lexsort((when, key))
+    key, values = key[order], values[order]
+    starts = np.flatnonzero(np.r_[True, key[1:] != key[:-1]]) if len(key) else np.empty(0, np.int64)
+    ends = np.r_[starts[1:], len(key)] if len(key) else starts
+    count = (ends - starts).astype(float)
+
+    computed = {}
+    if len(starts):
+        if "latest" in stats:
+            computed["latest"] = values[ends - 1]
+        if "min" in stats:
+            computed["min"] = np.minimum.reduceat(values, starts)
+        if "max" in stats:
+            computed["max"] = np.maximum.reduceat(values, starts)
+        if "mean" in stats:
+            computed["mean"] = np.add.reduceat(values, starts) / count
+        computed["count"] = count
+    else:
+        computed = {s: np.empty(0) for s in LAB_FEATURE_STATS}
+
+    # Groups are sorted by (row, test), so column indices are already sorted within rows
+    group_key = key[starts]
+    group_row, group_test = group_key // max(n_tests, 1), group_key % max(n_tests, 1)
+    data = np.column_stack([computed[s] for s in stats]).ravel() if n_stats else np.empty(0)
+    # One index dtype for indices and indptr, so scipy (and a memory-mapped load) keep them as is
+    idx_dtype = np.int32 if max(len(data), n_tests * n_stats) < 2 ** 31 else np.int64
+    indices = (group_test[:, None] * n_stats + np.arange(n_stats)).ravel().astype(idx_dtype)
+    indptr = np.zeros(len(row_ids) + 1, dtype=idx_dtype)
+    np.cumsum(np.bincount(group_row, minlength=len(row_ids)) * n_stats, out=indptr[1:])
+    matrix = csr_matrix((data, indices, indptr), shape=(len(row_ids), n_tests * n_stats))
+    return LabFeatures(matrix, row_ids, np.asarray(names, dtype=object), tuple(stats))
+
+
+def hstack_features(*blocks) -> csr_matrix:
+    """Column-stack dense or sparse blocks (e.g. a ColumnTransformer output and
+    LabFeatures.align(...)) into one CSR matrix without densifying."""
+    from scipy import sparse
+    return sparse.hstack([b if sparse.issparse(b) else sparse.csr_matrix(np.asarray(b, dtype=float))
+                          for b in blocks], format="csr")
+
+
+__all__ = [
+    "LAB_FEATURE_STATS",
+    "LabFeatures",
+    "build_lab_features",
+    "hstack_features",
+]
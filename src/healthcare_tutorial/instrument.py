@@ -0,0 +1,223 @@
+from __future__ import annotations
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+# Lightweight timing hooks for the public API.
+#
+# Functions decorated with @instrument record wall time, rows in/out, call counts and
+# (optionally) peak traced memory per call. When disabled the wrapper is a single
+# global check before calling through, so it can stay on every public function.
+#
+#   from healthcare_tutorial import instrument
+#   instrument.enable(memory=True)
+#   ... run pipeline ...
+#   print(instrument.summary())
+#   instrument.export_chrome_trace("trace.json")  # open in chrome://tracing or Perfetto
+#
+# Setting HEALTHCARE_TUTORIAL_INSTRUMENT=1 (or "memory") enables it at import.
+
+_ENABLED = False
+_TRACE_MEMORY = False
+_STARTED_TRACEMALLOC = False
+_LOCK = threading.Lock()
+_RECORDS: list[dict] = []
+_REGISTRY: dict[str, object] = {}
+_LOCAL = threading.local()
+_T0 = time.perf_counter()
+
+
+def enable(memory: bool = False) -> None:
+    """Start recording; memory=True also tracks peak allocations via tracemalloc."""
+    global _ENABLED, _TRACE_MEMORY, _STARTED_TRACEMALLOC
+    _TRACE_MEMORY = memory
+    if memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+        _STARTED_TRACEMALLOC = True
+    _ENABLED = True
+
+
+def disable() -> None:
+    """Stop recording (collected records are kept until reset())."""
+    global _ENABLED, _TRACE_MEMORY, _STARTED_TRACEMALLOC
+    _ENABLED = False
+    _TRACE_MEMORY = False
+    if _STARTED_TRACEMALLOC:
+        tracemalloc.stop()
+        _STARTED_TRACEMALLOC = False
+
+
+def is_enabled() -> bool:
+    return _ENABLED
+
+
+def reset() -> None:
+    """Drop all collected records."""
+    with _LOCK:
+        _RECORDS.clear()
+
+
+def registered() -> list[str]:
+    """Names of all instrumented functions."""
+    return sorted(_REGISTRY)
+
+
+def _count_rows(obj) -> int | None:
+    """Row count for frames/arrays, summed over tuples/lists/dict values."""
+    shape = getattr(obj, "shape", None)
+    if shape is not None and len(shape) > 0:
+        return int(shape[0])
+    if isinstance(obj, (tuple, list)):
+        vals = obj
+    elif isinstance(obj, dict):
+        vals = obj.values()
+    else:
+        return None
+    counts = [c for c in (_count_rows(v) for v in vals) if c is not None]
+    return sum(counts) if counts else None
+
+
+def _stack() -> list[dict]:
+    st = getattr(_LOCAL, "stack", None)
+    if st is None:
+        st = _LOCAL.stack = []
+    return st
+
+
+@contextmanager
+def span(name: str, rows_in: int | None = None):
+    """Record a block as one call; yields a dict where 'rows_out' may be set."""
+    if not _ENABLED:
+        yield {}
+        return
+    frame = {"rows_out": None, "child_peak": 0}
+    stack = _stack()
+    mem = _TRACE_MEMORY and tracemalloc.is_tracing()
+    if mem:
+        cur0, peak0 = tracemalloc.get_traced_memory()
+        if stack:
+            # Preserve the parent's peak before resetting for this frame
+            stack[-1]["child_peak"] = max(stack[-1]["child_peak"], peak0)
+        tracemalloc.reset_peak()
+    stack.append(frame)
+    start = time.perf_counter()
+    try:
+        yield frame
+    finally:
+        end = time.perf_counter()
+        stack.pop()
+        peak_delta = None
+        if mem:
+            _, peak = tracemalloc.get_traced_memory()
+            peak = max(peak, frame["child_peak"])
+            peak_delta = max(0, peak - cur0)
+            if stack:
+                stack[-1]["child_peak"] = max(stack[-1]["child_peak"], peak)
+        rec = {
+            "name": name,
+            "start_s": start - _T0,
+            "wall_s": end - start,
+            "rows_in": rows_in,
+            "rows_out": frame["rows_out"],
+            "peak_mem_delta_bytes": peak_delta,
+            "thread": threading.get_ident(),
+            "depth": len(stack),
+        }
+        with _LOCK:
+            _RECORDS.append(rec)
+
+
+def instrument(func=None, *, name: str | None = None):
+    """Decorator registering `func` for timing; usable as @instrument or @instrument(name=...)."""
+    def deco(f):
+        label = name or f"{f.__module__.rsplit('.', 1)[-1]}.{f.__qualname__}"
+
+        @functools.wraps(f)
+        def wrapper(*args, **kwargs):
+            if not _ENABLED:
+                return f(*args, **kwargs)
+            rows_in = _count_rows(list(args) + list(kwargs.values()))
+            with span(label, rows_in=rows_in) as frame:
+                out = f(*args, **kwargs)
+                frame["rows_out"] = _count_rows(out)
+            return out
+
+        _REGISTRY[label] = wrapper
+        return wrapper
+
+    return deco(func) if func is not None else deco
+
+
+def records() -> list[dict]:
+    """Copy of the raw per-call records."""
+    with _LOCK:
+        return [dict(r) for r in _RECORDS]
+
+
+def summary() -> dict[str, dict]:
+    """Per-function aggregates: calls, total/mean/max wall time, rows, max peak memory."""
+    out: dict[str, dict] = {}
+    for r in records():
+        s = out.setdefault(r["name"], {
+            "calls": 0, "total_s": 0.0, "max_s": 0.0,
+            "rows_in": 0, "rows_out": 0, "max_peak_mem_delta_bytes": None,
+        })
+        s["calls"] += 1
+        s["total_s"] += r["wall_s"]
+        s["max_s"] = max(s["max_s"], r["wall_s"])
+        s["rows_in"] += r["rows_in"] or 0
+        s["rows_out"] += r["rows_out"] or 0
+        if r["peak_mem_delta_bytes"] is not None:
+            s["max_peak_mem_delta_bytes"] = max(s["max_peak_mem_delta_bytes"] or 0, r["peak_mem_delta_bytes"])
+    for s in out.values():
+        s["mean_s"] = s["total_s"] / s["calls"]
+    return dict(sorted(out.items(), key=lambda kv: -kv[1]["total_s"]))
+
+
+def export_json(path: str) -> str:
+    """Write {'summary': ..., 'records': ...} to `path`."""
+    with open(path, "w") as f:
+        json.dump({"summary": summary(), "records": records()}, f, indent=2)
+    return path
+
+
+def export_chrome_trace(path: str) -> str:
+    """Write records in Chrome trace-event format (complete 'X' events, microseconds)."""
+    pid = os.getpid()
+    events = [{
+        "name": r["name"],
+        "cat": r["name"].split(".", 1)[0],
+        "ph": "X",
+        "ts": r["start_s"] * 1e6,
+        "dur": r["wall_s"] * 1e6,
+        "pid": pid,
+        "tid": r["thread"],
+        "args": {k: r[k] for k in ("rows_in", "rows_out", "peak_mem_delta_bytes") if r[k] is not None},
+    } for r in records()]
+    with open(path, "w") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+    return path
+
+
+_env = os.environ.get("HEALTHCARE_TUTORIAL_INSTRUMENT", "").strip().lower()
+if _env in ("1", "true", "yes", "memory"):
+    enable(memory=_env == "memory")
+
+
+__all__ = [
+    "enable",
+    "disable",
+    "is_enabled",
+    "reset",
+    "registered",
+    "span",
+    "instrument",
+    "records",
+    "summary",
+    "export_json",
+    "export_chrome_trace",
+]
@@ -0,0 +1,219 @@
+from __future__ import annotations
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+from .instrument import instrument
+
+# Patient deduplication / record linkage.
+#
+# Records are normalized (case, punctuation, whitespace, gender spellings, dates to days),
+# blocked on cheap keys (birth year or age, gender, site) and, within each block, compared
+# only with their `window` nearest neighbours in sorted order (sorted-neighbourhood), so
+# cost is O(n * window) rather than O(n^2). Field comparisons run on integer codes and
+# matching pairs are merged into clusters with connected components.
+
+_GENDER_MAP = {"m": "M", "male": "M", "man": "M", "boy": "M",
+               "f": "F", "female": "F", "woman": "F", "girl": "F"}
+
+
+def _normalize_values(s: pd.Series, name: str) -> pd.Series:
+    if pd.api.types.is_datetime64_any_dtype(s):
+        return s.dt.normalize()
+    if pd.api.types.is_numeric_dtype(s):
+        return s.round()
+    text = (s.astype("string").str.normalize("NFKD").str.casefold()
+            .str.replace(r"[^\w\s]", "", regex=True)
+            .str.replace(r"\s+", " ", regex=True).str.strip())
+    text = text.mask(text == "")
+    if name.lower() in ("gender", "sex"):
+        text = text.map(lambda v: _GENDER_MAP.get(v, v) if isinstance(v, str) else v)
+    return text
+
+
+def _normalized_codes(s: pd.Series, name: str) -> tuple[np.ndarray, pd.Series]:
+    """Codes of the normalized column (-1 = missing) and the normalized uniques.
+
+    Normalization runs once per distinct raw value, not once per row.
+    """
+    raw_codes, raw_uniques = pd.factorize(s, use_na_sentinel=True)
+    norm_uniques = _normalize_values(pd.Series(raw_uniques), name).reset_index(drop=True)
+    remap, uniques = pd.factorize(norm_uniques, use_na_sentinel=True)
+    codes = np.where(raw_codes >= 0, remap[np.maximum(raw_codes, 0)] if len(remap) else -1, -1)
+    return codes.astype(np.int64), pd.Series(uniques)
+
+
+def normalize_patients(df: pd.DataFrame, id_col: str = "PatientID") -> pd.DataFrame:
+    """Formatting-insensitive copy of the patient fields (id column left untouched)."""
+    out = pd.DataFrame(index=df.index)
+    for c in df.columns:
+        if c == id_col:
+            out[c] = df[c]
+            continue
+        codes, uniques = _normalized_codes(df[c], c)
+        values = uniques.take(np.maximum(codes, 0)).to_numpy() if len(uniques) else np.full(len(df), np.nan)
+        out[c] = pd.Series(values, index=df.index).where(codes >= 0)
+    birth = next((c for c in df.columns if c.lower() in ("birthdate", "birth_date", "dob")), None)
+    if birth is not None:
+        out["BirthYear"] = pd.to_datetime(df[birth], errors="coerce").dt.year
+    return out
+
+
+# Column-name fragments of fields that identify a person (names, birth date, identifiers);
+# clinical categoricals such as DiagnosisName or Age cannot tell two patients apart
+_IDENTIFYING = ("firstname", "lastname", "givenname", "familyname", "surname", "fullname",
+                "patientname", "birth", "dob", "mrn", "ssn", "healthcard", "insurance",
+                "phone", "email", "address", "postal", "zip")
+
+
+def identifying_fields(columns) -> list[str]:
+    """Columns whose names mark them as person identifiers (names, birth date, MRN, ...)."""
+    def key(c: str) -> str:
+        return "".join(ch for ch in c.lower() if ch.isalnum())
+    return [c for c in columns if key(c) in ("name", "first", "last") or any(f in key(c) for f in _IDENTIFYING)]
+
+
+def default_block_keys(df: pd.DataFrame) -> list[str]:
+    """Birth year (or Age) + gender + site, whichever are present."""
+    keys = ["BirthYear" if "BirthYear" in df.columns else "Age", "Gender", "HospitalSite"]
+    return [k for k in keys if k in df.columns]
+
+
+def _codes(df: pd.DataFrame, cols: list[str]) -> np.ndarray:
+    """(n, len(cols)) int64 codes of the normalized columns; -1 marks missing."""
+    out = np.empty((len(df), len(cols)), dtype=np.int64)
+    for j, c in enumerate(cols):
+        out[:, j] = _normalized_codes(df[c], c)[0]
+    return out
+
+
+def _combine_codes(codes: np.ndarray) -> np.ndarray:
+    """One dense code per distinct row of `codes` (rows with any -1 get -1)."""
+    n, k = codes.shape
+    if k == 0:
+        return np.zeros(n, dtype=np.int64)
+    cards = codes.max(axis=0) + 2
+    if np.prod(cards.astype(float)) < 2 ** 62:
+        combined = np.zeros(n, dtype=np.int64)
+        for j in range(k):
+            combined = combined * cards[j] + (codes[:, j] + 1)
+        out = pd.factorize(combined)[0].astype(np.int64)
+    else:
+        out = np.unique(codes, axis=0, return_inverse=True)[1].ravel().astype(np.int64)
+    out[(codes < 0).any(axis=1)] = -1
+    return out
+
+
+def _window_edges(block: np.ndarray, fields: np.ndarray, lo: int, hi: int, window: int,
+                  threshold: float, min_fields: int) -> tuple[np.ndarray, np.ndarray]:
+    """Matching (i, j) pairs among sorted rows [lo, hi) with j - i <= window, same block."""
+    src, dst = [], []
+    for w in range(1, window + 1):
+        i = np.arange(lo, max(lo, hi - w))
+        if len(i) == 0:
+            break
+        j = i + w
+        same = block[i] == block[j]
+        i, j = i[same], j[same]
+        a, b = fields[i], fields[j]
+        present = (a >= 0) & (b >= 0)
+        compared = present.sum(axis=1)
+        matched = ((a == b) & present).sum(axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            score = np.where(compared > 0, matched / np.maximum(compared, 1), 0.0)
+        keep = (compared >= min_fields) & (score >= threshold)
+        src.append(i[keep])
+        dst.append(j[keep])
+    if not src:
+        return np.empty(0, np.int64), np.empty(0, np.int64)
+    return np.concatenate(src), np.concatenate(dst)
+
+
+@instrument
+def link_patients(df: pd.DataFrame,
+                  id_col: str = "PatientID",
+                  block_on: list[str] | None = None,
+                  compare: list[str] | None = None,
+                  threshold: float = 1.0,
+                  min_fields: int = 2,
+                  window: int = 10,
+                  n_jobs: int = 1) -> pd.Series:
+    """Cluster near-duplicate patient records; returns ClusterID aligned to df.index.
+
+    block_on: exact-match blocking keys (default: birth year or Age, Gender, HospitalSite).
+    compare: fields scored within blocks (default: all other non-id columns).
+    threshold: minimum fraction of compared (non-missing) fields that must agree.
+    min_fields: minimum number of fields present in both records, so one agreeing
+    categorical cannot link two patients.
+    window: neighbours compared per record after sorting each block on `compare`.
+    n_jobs: threads used to score row ranges in parallel.
+    The ClusterID is the smallest id_col value in the cluster. Raises ValueError when
+    `compare` holds no identifying field (see identifying_fields).
+    """
+    src_df = df
+    birth = next((c for c in df.columns if c.lower() in ("birthdate", "birth_date", "dob")), None)
+    if birth is not None:
+        src_df = df.assign(BirthYear=pd.to_datetime(df[birth], errors="coerce").dt.year)
+    block_on = block_on or default_block_keys(src_df)
+    compare = compare or [c for c in src_df.columns if c != id_col and c not in block_on]
+    if not identifying_fields(compare):
+        # Without names, birth dates or identifiers, distinct patients who share a
+        # diagnosis and demographics would be merged
+        raise ValueError(f"compare fields {compare} include no identifying field "
+                         "(name, birth date or identifier); refusing to link on them")
+    n = len(src_df)
+    if n == 0:
+        return pd.Series([], index=df.index, name="ClusterID", dtype=df[id_col].dtype)
+
+    # Rows with a missing blocking key get -1 and are never paired
+    block = _combine_codes(_codes(src_df, block_on))
+    fields = _codes(src_df, compare)
+    # Sort by block, then by compared fields so likely duplicates are adjacent
+    order = np.lexsort(tuple(fields[:, ::-1].T) + (block,))
+    block_s, fields_s = block[order], fields[order]
+    block_s = np.where(block_s < 0, -1 - np.arange(n), block_s)
+
+    # Split sorted rows into ranges for workers; pairs straddling a range edge are
+    # covered by letting each range look `window` rows past its end
+    n_jobs = max(1, n_jobs)
+    bounds = np.linspace(0, n, n_jobs + 1).astype(int)
+    tasks = [(int(bounds[k]), int(bounds[k + 1])) for k in range(n_jobs)]
+
+    def run(task):
+        lo, end = task
+        i, j = _window_edges(block_s, fields_s, lo, min(n, end + window), window, threshold, min_fields)
+        keep = i < end  # each pair is owned by the range containing its left row
+        return i[keep], j[keep]
+
+    if n_jobs == 1:
+        parts = [run(tasks[0])]
+    else:
+        with ThreadPoolExecutor(max_workers=n_jobs) as pool:
+            parts = list(pool.map(run, tasks))
+    src = np.concatenate([p[0] for p in parts])
+    dst = np.concatenate([p[1] for p in parts])
+
+    from scipy.sparse import coo_matrix
+    from scipy.sparse.csgraph import connected_components
+    graph = coo_matrix((np.ones(len(src), dtype=np.int8), (order[src], order[dst])), shape=(n, n))
+    _, labels = connected_components(graph, directed=False)
+    ids = df[id_col].to_numpy()
+    rep = pd.Series(ids).groupby(labels).transform("min").to_numpy()
+    return pd.Series(rep, index=df.index, name="ClusterID")
+
+
+def deduplicate_patients(df: pd.DataFrame, id_col: str = "PatientID", **link_kwargs) -> pd.DataFrame:
+    """Keep one record per link_patients cluster: the first row carrying the smallest id."""
+    clusters = link_patients(df, id_col=id_col, **link_kwargs)
+    is_min = df[id_col].to_numpy() == clusters.to_numpy()
+    # Exact duplicates share the smallest id, so also drop repeats of a cluster
+    first = ~clusters.where(is_min).duplicated().to_numpy()
+    return df[is_min & first]
+
+
+__all__ = [
+    "normalize_patients",
+    "identifying_fields",
+    "default_block_keys",
+    "link_patients",
+    "deduplicate_patients",
+]
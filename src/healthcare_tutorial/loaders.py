@@ -1,46 +1,234 @@
 from __future__ import annotations
+import datetime
+import functools
+import glob
+import io
 import os
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
 import numpy as np
 from .data_gen import SyntheticConfig, make_patients, make_admissions, make_labs
+from .instrument import instrument
 
 
-def _maybe_parse_dates(df: pd.DataFrame, cols: list[str]) -> pd.DataFrame:
-    out = df.copy()
+_CSV_FILES = ("patients.csv", "admissions.csv", "labs.csv")
+_SYNTHEA_FILES = ("Patients.csv", "Encounters.csv", "Observations.csv")
+_DATE_COLS = ([], ["AdmissionDate", "DischargeDate"], ["CollectedDate"])
+_ID_MAP_COLUMNS = ["Source", "SourcePatientID", "PatientID"]
+
+
+@functools.lru_cache(maxsize=None)
+def _parsed_datetime_unit() -> str:
+    # The pyarrow reader yields second-resolution timestamps; convert them to whatever unit
+    # pandas gives when it parses the strings itself, so both readers agree
+    return np.datetime_data(pd.to_datetime(pd.Series(["2000-01-01"])).dtype)[0]
+
+
+def _maybe_parse_dates(df: pd.DataFrame, cols: list[str], copy: bool = True) -> pd.DataFrame:
+    out = df.copy() if copy else df
     for c in cols:
         if c in out.columns:
-            out[c] = pd.to_datetime(out[c], errors="coerce")
+            parsed = pd.to_datetime(out[c], errors="coerce")
+            # Only the unit changes: timezone-aware columns (e.g. "...Z") stay aware
+            if pd.api.types.is_datetime64_any_dtype(parsed.dtype):
+                parsed = parsed.dt.as_unit(_parsed_datetime_unit())
+            out[c] = parsed
     return out
 
 
-def load_healthcare_data(data_dir: str | None = None,
-                         cfg: SyntheticConfig | None = None) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+@functools.lru_cache(maxsize=None)
+def _text_dtype():
+    # Dtype the default parser gives text columns (object, or str on pandas >= 3)
+    return pd.read_csv(io.StringIO("a\nx\n")).dtypes["a"]
+
+
+def _is_inferred_temporal(s: pd.Series) -> bool:
+    if pd.api.types.is_datetime64_any_dtype(s.dtype):
+        return True
+    if s.dtype != object:
+        return False
+    first = s.first_valid_index()
+    return first is not None and isinstance(s[first], (datetime.date, datetime.time))
+
+
+def _read_csv(path: str, parse_dates: list[str] = ()) -> pd.DataFrame:
+    """pd.read_csv with the multithreaded pyarrow parser (it releases the GIL).
+
+    pyarrow infers dates and times in every column; columns outside `parse_dates` that it
+    typed that way are re-read as text, so the frame matches the default parser.
+    """
+    try:
+        df = pd.read_csv(path, engine="pyarrow")
+    except ImportError:
+        return pd.read_csv(path)
+    inferred = [c for c in df.columns if c not in parse_dates and _is_inferred_temporal(df[c])]
+    if inferred:
+        import pyarrow as pa
+        from pyarrow import csv
+        opts = csv.ConvertOptions(include_columns=inferred, strings_can_be_null=True,
+                                  column_types={c: pa.string() for c in inferred})
+        text = csv.read_csv(path, convert_options=opts)
+        for c in inferred:
+            col = text.column(c).to_pandas().astype(_text_dtype())
+            df[c] = col.where(col.notna(), np.nan)
+    return df
+
+
+def _source_kind(data_dir: str) -> str | None:
+    """"csv" for our schema, "synthea" for Synthea exports, None if neither is complete."""
+    if all(os.path.exists(os.path.join(data_dir, f)) for f in _CSV_FILES):
+        return "csv"
+    if all(os.path.exists(os.path.join(data_dir, f)) for f in _SYNTHEA_FILES):
+        return "synthea"
+    return None
+
+
+def _submit_csv_source(pool: ThreadPoolExecutor, data_dir: str) -> list:
+    return [pool.submit(_read_csv, os.path.join(data_dir, f), cols) for f, cols in zip(_CSV_FILES, _DATE_COLS)]
+
+
+def _expand_sources(sources) -> list[str]:
+    """Directories named by paths and/or glob patterns, in order, without duplicates."""
+    if isinstance(sources, (str, os.PathLike)):
+        sources = [sources]
+    dirs = []
+    for src in map(os.fspath, sources):
+        matches = sorted(glob.glob(src)) if glob.has_magic(src) else [src]
+        for m in matches:
+            m = os.path.abspath(m)
+            if os.path.isdir(m) and m not in dirs:
+                dirs.append(m)
+    return dirs
+
+
+def _source_names(dirs: list[str]) -> list[str]:
+    """Directory basenames, falling back to full paths when basenames collide."""
+    names = [os.path.basename(d) for d in dirs]
+    return names if len(set(names)) == len(names) else list(dirs)
+
+
+def _local_patient_ids(df: pd.DataFrame, source: str) -> tuple[np.ndarray, np.ndarray]:
+    """(ids, present): source PatientIDs as int64 (0 where missing) and a not-missing mask."""
+    pid = pd.to_numeric(df["PatientID"], errors="coerce")
+    present = pid.notna().to_numpy()
+    if (~present & df["PatientID"].notna().to_numpy()).any():
+        raise ValueError(f"{source}: PatientID has non-numeric values")
+    return pid.fillna(0).to_numpy(dtype=np.int64), present
+
+
+def _remap_patient_ids(parts: dict[str, tuple], mapping_path: str | None) -> pd.DataFrame:
+    """Rewrite each source's PatientIDs (in place) into one disjoint global id space.
+
+    (Source, SourcePatientID) pairs already in the mapping file keep their global id; new
+    pairs get ids after the current maximum. The updated mapping is written back. Missing
+    ids stay missing, so the DQ checks still count those rows.
+    """
+    if mapping_path and os.path.exists(mapping_path):
+        mapping = pd.read_csv(mapping_path, dtype={"Source": str, "SourcePatientID": np.int64, "PatientID": np.int64})
+    else:
+        mapping = pd.DataFrame({"Source": pd.Series(dtype=str), "SourcePatientID": pd.Series(dtype=np.int64),
+                                "PatientID": pd.Series(dtype=np.int64)})
+    next_id = int(mapping["PatientID"].max()) + 1 if len(mapping) else 1
+    added = []
+    for name, tables in parts.items():
+        local = [_local_patient_ids(t, name) for t in tables]
+        known = mapping[mapping["Source"] == name]
+        keys = known["SourcePatientID"].to_numpy(dtype=np.int64)
+        values = known["PatientID"].to_numpy(dtype=np.int64)
+        seen = np.unique(np.concatenate([ids[present] for ids, present in local]))
+        new = seen[~np.isin(seen, keys)]
+        if len(new):
+            new_ids = np.arange(next_id, next_id + len(new), dtype=np.int64)
+            next_id += len(new)
+            added.append(pd.DataFrame({"Source": name, "SourcePatientID": new, "PatientID": new_ids}))
+            keys, values = np.concatenate([keys, new]), np.concatenate([values, new_ids])
+        lookup = pd.Index(keys)
+        for t, (ids, present) in zip(tables, local):
+            mapped = values[lookup.get_indexer(ids[present])]
+            if present.all():
+                t["PatientID"] = mapped
+            else:
+                col = np.full(len(ids), np.nan)
+                col[present] = mapped
+                t["PatientID"] = col
+    if added:
+        mapping = pd.concat([mapping, *added], ignore_index=True)
+        if mapping_path:
+            tmp = f"{mapping_path}.tmp"
+            mapping[_ID_MAP_COLUMNS].to_csv(tmp, index=False)
+            os.replace(tmp, mapping_path)
+    return mapping
+
+
+@instrument
+def load_multi_source_data(sources,
+                           mapping_path: str | None = None,
+                           max_workers: int | None = None) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """Load several site extracts concurrently into one disjoint PatientID space.
+
+    sources: directories and/or glob patterns; each must hold our CSVs or a Synthea export.
+    mapping_path: CSV of (Source, SourcePatientID, PatientID); read if present and
+    extended with new patients, so global ids stay stable across loads.
+    max_workers: reader threads (default: one per file).
+
+    Every file is read on a shared thread pool, so wall time tracks the largest extract.
+    Returns (patients, admissions, labs), each with a categorical Source column.
+    """
+    dirs = _expand_sources(sources)
+    if not dirs:
+        raise FileNotFoundError(f"no source directories match {sources!r}")
+    names = _source_names(dirs)
+    kinds = {d: _source_kind(d) for d in dirs}
+    missing = [d for d, k in kinds.items() if k is None]
+    if missing:
+        raise FileNotFoundError(f"no patients/admissions/labs CSVs or Synthea export in: {missing}")
+
+    workers = max_workers or sum(len(_CSV_FILES) if k == "csv" else 1 for k in kinds.values())
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {name: _submit_csv_source(pool, d) if kinds[d] == "csv" else pool.submit(_load_synthea, d)
+                   for name, d in zip(names, dirs)}
+        parts = {}
+        for name, fut in futures.items():
+            tables = [f.result() for f in fut] if isinstance(fut, list) else list(fut.result())
+            parts[name] = tuple(_maybe_parse_dates(t, cols, copy=False) for t, cols in zip(tables, _DATE_COLS))
+
+    _remap_patient_ids(parts, mapping_path)
+
+    out = []
+    for k in range(3):
+        frames = [parts[name][k] for name in names]
+        combined = pd.concat(frames, ignore_index=True)
+        codes = np.repeat(np.arange(len(names)), [len(f) for f in frames])
+        combined["Source"] = pd.Categorical.from_codes(codes, categories=names)
+        out.append(combined)
+    return tuple(out)
+
+
+@instrument
+def load_healthcare_data(data_dir=None,
+                         cfg: SyntheticConfig | None = None,
+                         mapping_path: str | None = None,
+                         max_workers: int | None = None) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
     """Load patients, admissions, labs.
 
-    If CSVs exist under data_dir, load them; otherwise generate synthetic data.
+    If CSVs exist under data_dir, load them (the three files are read concurrently);
+    otherwise generate synthetic data. A list of directories or a glob pattern loads
+    every site with load_multi_source_data (mapping_path/max_workers are passed on).
 
     Returns: (patients, admissions, labs)
     """
+    if isinstance(data_dir, (list, tuple)) or (isinstance(data_dir, str) and glob.has_magic(data_dir)):
+        return load_multi_source_data(data_dir, mapping_path=mapping_path, max_workers=max_workers)
     data_dir = data_dir or os.path.join(os.path.dirname(os.path.dirname(__file__)), "..", "data")
     data_dir = os.path.abspath(data_dir)
 
-    p_csv = os.path.join(data_dir, "patients.csv")
-    a_csv = os.path.join(data_dir, "admissions.csv")
-    l_csv = os.path.join(data_dir, "labs.csv")
-
-    if all(os.path.exists(p) for p in [p_csv, a_csv, l_csv]):
-        patients = pd.read_csv(p_csv)
-        admissions = pd.read_csv(a_csv)
-        labs = pd.read_csv(l_csv)
-        admissions = _maybe_parse_dates(admissions, ["AdmissionDate", "DischargeDate"]) 
-        labs = _maybe_parse_dates(labs, ["CollectedDate"]) 
-        return patients, admissions, labs
+    if _source_kind(data_dir) == "csv":
+        with ThreadPoolExecutor(max_workers=len(_CSV_FILES)) as pool:
+            tables = [f.result() for f in _submit_csv_source(pool, data_dir)]
+        return tuple(_maybe_parse_dates(t, cols, copy=False) for t, cols in zip(tables, _DATE_COLS))
 
     # Try Synthea Kaggle files if present
-    syn_pat = os.path.join(data_dir, "Patients.csv")
-    syn_enc = os.path.join(data_dir, "Encounters.csv")
-    syn_obs = os.path.join(data_dir, "Observations.csv")
-    if all(os.path.exists(p) for p in [syn_pat, syn_enc, syn_obs]):
+    if _source_kind(data_dir) == "synthea":
         patients, admissions, labs = _load_synthea(data_dir)
         return patients, admissions, labs
 
@@ -52,9 +240,10 @@ def load_healthcare_data(data_dir: str | None = None,
     return patients, admissions, labs
 
 
-__all__ = ["load_healthcare_data"]
+__all__ = ["load_healthcare_data", "load_multi_source_data"]
 
 
+@instrument
 def _load_synthea(data_dir: str) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
     """Map Synthea CSVs (Patients, Encounters, Observations) into our schema in-memory.
 
@@ -1,20 +1,29 @@
 from __future__ import annotations
 import pandas as pd
 import numpy as np
-from sklearn.impute import SimpleImputer, KNNImputer
-from sklearn.pipeline import Pipeline
-from sklearn.preprocessing import OneHotEncoder
-from sklearn.compose import ColumnTransformer
+from typing import TYPE_CHECKING
+from .instrument import instrument
 
+# scikit-learn is imported inside the functions that need it to keep imports cheap
+if TYPE_CHECKING:
+    from sklearn.pipeline import Pipeline
 
+
+@instrument
 def knn_impute_numeric(df: pd.DataFrame, cols: list[str], n_neighbors: int = 5) -> pd.DataFrame:
+    from sklearn.impute import KNNImputer
     out = df.copy()
     imputer = KNNImputer(n_neighbors=n_neighbors)
     out[cols] = imputer.fit_transform(out[cols])
     return out
 
 
+@instrument
 def build_cleaning_pipeline(numeric_features: list[str], categorical_features: list[str]) -> Pipeline:
+    from sklearn.compose import ColumnTransformer
+    from sklearn.impute import SimpleImputer
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import OneHotEncoder
     numeric_transformer = Pipeline(steps=[
         ("imputer", SimpleImputer(strategy="median")),
     ])
@@ -0,0 +1,175 @@
+from __future__ import annotations
+import json
+import os
+import numpy as np
+import pandas as pd
+from .instrument import instrument
+
+# CSR-style per-patient index: each table is sorted by (PatientID, date) once and an
+# offsets array (indexed directly by PatientID) gives the row range of every patient, so a
+# lookup is two array reads plus a slice instead of a full boolean scan.
+#
+#   idx = PatientIndex.build(admissions, labs)
+#   idx.admissions(42); idx.labs_for([1, 2, 3])
+#   idx.save("data/patient_index"); PatientIndex.load("data/patient_index")  # memory-mapped
+
+_DATE_COLS = {"admissions": "AdmissionDate", "labs": "CollectedDate"}
+
+
+def _csr_offsets(ids: np.ndarray, n_ids: int) -> np.ndarray:
+    offsets = np.zeros(n_ids + 1, dtype=np.int64)
+    np.cumsum(np.bincount(ids, minlength=n_ids), out=offsets[1:])
+    return offsets
+
+
+def _take_rows(table, idx: np.ndarray) -> pd.DataFrame:
+    if isinstance(table, pd.DataFrame):
+        return table.take(idx)
+    return table.take(idx).to_pandas()
+
+
+class PatientIndex:
+    """Sorted tables plus per-PatientID row offsets for O(1) history lookups.
+
+    Tables are pandas DataFrames after build(), or memory-mapped Arrow tables after
+    load(mmap=True); lookups return DataFrames either way.
+    """
+
+    def __init__(self, tables: dict, offsets: dict[str, np.ndarray], id_col: str = "PatientID"):
+        self.tables = tables
+        self.offsets = offsets
+        self.id_col = id_col
+
+    @classmethod
+    @instrument(name="patient_index.PatientIndex.build")
+    def build(cls, admissions: pd.DataFrame | None = None, labs: pd.DataFrame | None = None,
+              id_col: str = "PatientID", **tables: pd.DataFrame) -> "PatientIndex":
+        """Sort each table by (id_col, date) and compute CSR offsets.
+
+        Extra tables can be passed as keyword arguments; they are sorted by id only.
+        PatientIDs must be non-negative integers (as produced by the loaders); rows with a
+        missing PatientID belong to no patient and are left out of the index.
+        """
+        frames = {"admissions": admissions, "labs": labs, **tables}
+        frames = {k: v for k, v in frames.items() if v is not None}
+        ids = {}
+        for name, df in frames.items():
+            present = df[id_col].notna()
+            if not present.all():
+                df = frames[name] = df[present.to_numpy()]
+            pid = pd.to_numeric(df[id_col], errors="coerce")
+            if pid.isna().any():
+                raise ValueError(f"{name}: {id_col} has non-numeric values")
+            arr = pid.to_numpy(dtype=np.int64)
+            if len(arr) and arr.min() < 0:
+                raise ValueError(f"{name}: {id_col} must be non-negative")
+            ids[name] = arr
+        n_ids = 1 + max((int(a.max()) for a in ids.values() if len(a)), default=-1)
+
+        sorted_tables, offsets = {}, {}
+        for name, df in frames.items():
+            date_col = _DATE_COLS.get(name)
+            if date_col in df.columns:
+                order = np.lexsort((df[date_col].to_numpy(), ids[name]))
+            else:
+                order = np.argsort(ids[name], kind="stable")
+            sorted_tables[name] = df.take(order).reset_index(drop=True)
+            offsets[name] = _csr_offsets(ids[name], n_ids)
+        return cls(sorted_tables, offsets, id_col)
+
+    @property
+    def n_ids(self) -> int:
+        """One past the largest PatientID covered by the offsets."""
+        return len(next(iter(self.offsets.values()))) - 1 if self.offsets else 0
+
+    def _range(self, table: str, patient_id: int) -> tuple[int, int]:
+        off = self.offsets[table]
+        pid = int(patient_id)
+        if pid < 0 or pid + 1 >= len(off):
+            return 0, 0
+        return int(off[pid]), int(off[pid + 1])
+
+    def get(self, table: str, patient_id: int) -> pd.DataFrame:
+        """Rows of `table` for one patient, in date order (a slice, not a copy)."""
+        start, stop = self._range(table, patient_id)
+        t = self.tables[table]
+        if isinstance(t, pd.DataFrame):
+            return t.iloc[start:stop]
+        return t.slice(start, stop - start).to_pandas()
+
+    def get_many(self, table: str, patient_ids) -> pd.DataFrame:
+        """Rows of `table` for a list of patients, grouped in the order given."""
+        off = self.offsets[table]
+        ids = np.asarray(patient_ids, dtype=np.int64)
+        ids = ids[(ids >= 0) & (ids + 1 < len(off))]
+        starts, stops = off[ids], off[ids + 1]
+        lens = stops - starts
+        total = int(lens.sum())
+        # Expand [start, stop) ranges into row positions without a Python loop
+        seg_start = np.repeat(np.cumsum(lens) - lens, lens)
+        idx = np.arange(total, dtype=np.int64) - seg_start + np.repeat(starts, lens)
+        return _take_rows(self.tables[table], idx)
+
+    def count(self, table: str, patient_ids=None) -> np.ndarray:
+        """Rows per patient (for all ids 0..n_ids-1 when patient_ids is None).
+
+        Unknown ids count 0, matching the empty result of get/get_many.
+        """
+        counts = np.diff(self.offsets[table])
+        if patient_ids is None:
+            return counts
+        ids = np.asarray(patient_ids, dtype=np.int64)
+        known = (ids >= 0) & (ids < len(counts))
+        out = np.zeros(ids.shape, dtype=counts.dtype)
+        out[known] = counts[ids[known]]
+        return out if ids.ndim else out[()]
+
+    def admissions(self, patient_id: int) -> pd.DataFrame:
+        return self.get("admissions", patient_id)
+
+    def labs(self, patient_id: int) -> pd.DataFrame:
+        return self.get("labs", patient_id)
+
+    def admissions_for(self, patient_ids) -> pd.DataFrame:
+        return self.get_many("admissions", patient_ids)
+
+    def labs_for(self, patient_ids) -> pd.DataFrame:
+        return self.get_many("labs", patient_ids)
+
+    def timeline(self, patient_id: int) -> tuple[pd.DataFrame, pd.DataFrame]:
+        """(admissions, labs) for one patient."""
+        return self.admissions(patient_id), self.labs(patient_id)
+
+    def save(self, path: str) -> str:
+        """Write tables as uncompressed Arrow IPC files and offsets as .npy under `path`."""
+        import pyarrow as pa
+        import pyarrow.feather as feather
+        os.makedirs(path, exist_ok=True)
+        for name, t in self.tables.items():
+            if isinstance(t, pd.DataFrame):
+                t = pa.Table.from_pandas(t, preserve_index=False)
+            feather.write_feather(t, os.path.join(path, f"{name}.arrow"), compression="uncompressed")
+            np.save(os.path.join(path, f"{name}_offsets.npy"), np.asarray(self.offsets[name]))
+        with open(os.path.join(path, "meta.json"), "w") as f:
+            json.dump({"id_col": self.id_col, "tables": list(self.tables)}, f)
+        return path
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> "PatientIndex":
+        """Open a saved index; with mmap=True nothing is read until rows are sliced."""
+        import pyarrow as pa
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        tables, offsets = {}, {}
+        for name in meta["tables"]:
+            arrow_path = os.path.join(path, f"{name}.arrow")
+            source = pa.memory_map(arrow_path, "r") if mmap else pa.OSFile(arrow_path, "rb")
+            table = pa.ipc.open_file(source).read_all()
+            tables[name] = table if mmap else table.to_pandas()
+            offsets[name] = np.load(os.path.join(path, f"{name}_offsets.npy"), mmap_mode="r" if mmap else None)
+        return cls(tables, offsets, meta["id_col"])
+
+
+__all__ = [
+    "PatientIndex",
+]
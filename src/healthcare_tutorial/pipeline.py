@@ -0,0 +1,294 @@
+from __future__ import annotations
+import hashlib
+import inspect
+import os
+import pickle
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from operator import itemgetter
+from typing import Any, Callable
+
+import numpy as np
+import pandas as pd
+
+from .instrument import span
+
+# DAG runner: library functions declared as nodes with named inputs. Independent nodes run
+# concurrently on a thread/process pool, and node outputs can be cached on disk keyed by a
+# fingerprint of the node's code, kwargs and input data.
+
+
+def fingerprint(obj: Any) -> str:
+    """Content hash (sha256 hex) of frames, arrays and plain Python containers."""
+    h = hashlib.sha256()
+    _update_fp(h, obj)
+    return h.hexdigest()
+
+
+def _update_fp(h, obj: Any) -> None:
+    if isinstance(obj, (pd.DataFrame, pd.Series)):
+        h.update(type(obj).__name__.encode())
+        h.update(repr(list(obj.columns) if isinstance(obj, pd.DataFrame) else obj.name).encode())
+        h.update(repr(obj.dtypes.to_dict() if isinstance(obj, pd.DataFrame) else obj.dtype).encode())
+        try:
+            h.update(pd.util.hash_pandas_object(obj, index=True).to_numpy().tobytes())
+        except TypeError:  # unhashable cells (lists, dicts)
+            h.update(pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL))
+    elif isinstance(obj, np.ndarray):
+        h.update(repr((obj.dtype.str, obj.shape)).encode())
+        h.update(np.ascontiguousarray(obj).tobytes() if obj.dtype != object else pickle.dumps(obj))
+    elif isinstance(obj, (tuple, list)):
+        h.update(f"{type(obj).__name__}{len(obj)}".encode())
+        for v in obj:
+            _update_fp(h, v)
+    elif isinstance(obj, dict):
+        h.update(f"dict{len(obj)}".encode())
+        for k in sorted(obj, key=repr):
+            h.update(repr(k).encode())
+            _update_fp(h, obj[k])
+    else:
+        h.update(pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def _update_code(h, code) -> None:
+    # Bytecode alone misses edited constants (`> 7` -> `> 10` compiles to the same co_code)
+    h.update(code.co_code)
+    h.update(repr(code.co_names).encode())
+    for c in code.co_consts:
+        if inspect.iscode(c):  # nested functions, lambdas, comprehensions
+            _update_code(h, c)
+        else:
+            h.update(repr(c).encode())
+
+
+def _func_id(func: Callable) -> str:
+    """Stable identity for cache keys: qualified name plus code, constants and defaults
+    (so edits invalidate)."""
+    f = inspect.unwrap(func)
+    name = f"{getattr(f, '__module__', '')}.{getattr(f, '__qualname__', repr(f))}"
+    code = getattr(f, "__code__", None)
+    if code is not None:
+        h = hashlib.sha256()
+        _update_code(h, code)
+        _update_fp(h, (getattr(f, "__defaults__", None), getattr(f, "__kwdefaults__", None)))
+        name += ":" + h.hexdigest()[:16]
+    elif isinstance(f, itemgetter):
+        name = repr(f)
+    return name
+
+
+@dataclass
+class Node:
+    name: str
+    func: Callable
+    inputs: tuple[str, ...] = ()
+    kwargs: dict = field(default_factory=dict)
+    cache: bool = True
+
+
+class Pipeline:
+    """A DAG of named nodes; each node's positional args are the outputs of `inputs`."""
+
+    def __init__(self, nodes: list[Node] | None = None):
+        self.nodes: dict[str, Node] = {}
+        for n in nodes or []:
+            self._add_node(n)
+
+    def _add_node(self, node: Node) -> None:
+        if node.name in self.nodes:
+            raise ValueError(f"duplicate node name: {node.name}")
+        self.nodes[node.name] = node
+
+    def add(self, name: str, func: Callable, inputs: tuple[str, ...] | list[str] = (),
+            cache: bool = True, **kwargs) -> "Pipeline":
+        self._add_node(Node(name, func, tuple(inputs), kwargs, cache))
+        return self
+
+    def _required(self, targets: list[str] | None, provided: dict) -> list[str]:
+        """Nodes needed for `targets` (all nodes if None), in topological order."""
+        order: list[str] = []
+        state: dict[str, int] = {}
+
+        def visit(name: str) -> None:
+            if name in provided:
+                return
+            if name not in self.nodes:
+                raise KeyError(f"unknown node or input: {name}")
+            if state.get(name) == 1:
+                raise ValueError(f"cycle detected at node: {name}")
+            if state.get(name) == 2:
+                return
+            state[name] = 1
+            for dep in self.nodes[name].inputs:
+                visit(dep)
+            state[name] = 2
+            order.append(name)
+
+        for t in targets or list(self.nodes):
+            visit(t)
+        return order
+
+    def levels(self, targets: list[str] | None = None) -> list[list[str]]:
+        """Group nodes into waves that can run concurrently."""
+        depth: dict[str, int] = {}
+        for name in self._required(targets, {}):
+            depth[name] = 1 + max((depth[d] for d in self.nodes[name].inputs), default=-1)
+        waves: list[list[str]] = [[] for _ in range(max(depth.values(), default=-1) + 1)]
+        for name, d in depth.items():
+            waves[d].append(name)
+        return waves
+
+    def run(self, targets: list[str] | None = None,
+            values: dict[str, Any] | None = None,
+            max_workers: int | None = None,
+            executor: str = "thread",
+            cache_dir: str | None = None) -> dict[str, Any]:
+        """Execute the DAG and return {node_name: output} for every node that ran.
+
+        values: externally supplied inputs (names usable in `inputs`).
+        executor: "thread", "process" or "serial".
+        cache_dir: if set, cacheable node outputs are pickled there keyed by fingerprints.
+        Inputs and outputs are only fingerprinted when cache_dir is set.
+        """
+        results: dict[str, Any] = dict(values or {})
+        fps: dict[str, str | None] = {k: fingerprint(v) for k, v in results.items()} if cache_dir else {}
+        order = self._required(targets, results)
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+        pending = {n: set(d for d in self.nodes[n].inputs if d not in results) for n in order}
+        dependents: dict[str, list[str]] = {n: [] for n in order}
+        for n in order:
+            for d in pending[n]:
+                dependents[d].append(n)
+
+        def finish(name: str, out: Any, fp: str | None) -> list[str]:
+            results[name] = out
+            fps[name] = fp
+            ready = []
+            for child in dependents[name]:
+                pending[child].discard(name)
+                if not pending[child]:
+                    ready.append(child)
+            return ready
+
+        def cache_paths(node: Node) -> tuple[str, str] | None:
+            if not (cache_dir and node.cache):
+                return None
+            key = fingerprint((_func_id(node.func), sorted(node.kwargs.items(), key=repr),
+                               [fps[d] for d in node.inputs]))
+            base = os.path.join(cache_dir, f"{node.name}-{key[:32]}")
+            return base + ".pkl", base + ".fp"
+
+        ready = [n for n in order if not pending[n]]
+        if executor == "serial":
+            while ready:
+                name = ready.pop(0)
+                node = self.nodes[name]
+                hit = _cache_load(cache_paths(node))
+                if hit is None:
+                    out = _call_node(node.func, [results[d] for d in node.inputs], node.kwargs, name)
+                    hit = (out, _cache_store(cache_paths(node), out) if cache_dir else None)
+                ready.extend(finish(name, *hit))
+            return {n: results[n] for n in order}
+
+        pool_cls = ProcessPoolExecutor if executor == "process" else ThreadPoolExecutor
+        with pool_cls(max_workers=max_workers) as pool:
+            running: dict = {}
+            while ready or running:
+                for name in ready:
+                    node = self.nodes[name]
+                    paths = cache_paths(node)
+                    hit = _cache_load(paths)
+                    if hit is not None:
+                        ready.extend(finish(name, *hit))
+                        continue
+                    fut = pool.submit(_call_node, node.func, [results[d] for d in node.inputs], node.kwargs, name)
+                    running[fut] = (name, paths)
+                ready = []
+                if not running:
+                    continue
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    name, paths = running.pop(fut)
+                    out = fut.result()
+                    ready.extend(finish(name, out, _cache_store(paths, out) if cache_dir else None))
+        return {n: results[n] for n in order}
+
+
+def _call_node(func: Callable, args: list, kwargs: dict, name: str) -> Any:
+    with span(f"pipeline.{name}"):
+        return func(*args, **kwargs)
+
+
+def _cache_load(paths: tuple[str, str] | None) -> tuple[Any, str] | None:
+    if paths is None or not (os.path.exists(paths[0]) and os.path.exists(paths[1])):
+        return None
+    try:
+        with open(paths[0], "rb") as f:
+            out = pickle.load(f)
+        with open(paths[1]) as f:
+            fp = f.read().strip()
+    except (OSError, EOFError, pickle.UnpicklingError):
+        return None
+    return out, fp
+
+
+def _cache_store(paths: tuple[str, str] | None, out: Any) -> str:
+    """Persist `out` (if cacheable) and return its content fingerprint."""
+    fp = fingerprint(out)
+    if paths is not None:
+        tmp = paths[0] + ".tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(out, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, paths[0])
+        with open(paths[1], "w") as f:
+            f.write(fp)
+    return fp
+
+
+def _enrich_admissions(patients: pd.DataFrame, admissions: pd.DataFrame) -> pd.DataFrame:
+    return admissions.merge(patients[["PatientID", "Age", "DiagnosisName"]], on="PatientID", how="left")
+
+
+def healthcare_pipeline(data_dir: str | None = None, cfg=None) -> Pipeline:
+    """The tutorial workflow (load -> validate -> analytics -> ETL) as a DAG."""
+    from . import analytics, dq, etl
+    from .loaders import load_healthcare_data
+
+    p = Pipeline()
+    # Loading always reruns; downstream caching is keyed on the loaded data's content
+    p.add("load", load_healthcare_data, cache=False, data_dir=data_dir, cfg=cfg)
+    p.add("patients", itemgetter(0), ["load"], cache=False)
+    p.add("admissions", itemgetter(1), ["load"], cache=False)
+    p.add("labs", itemgetter(2), ["load"], cache=False)
+    p.add("adm_enriched", _enrich_admissions, ["patients", "admissions"])
+
+    p.add("profile_patients", dq.comprehensive_data_profile, ["patients"])
+    p.add("age_flags", dq.validate_pediatric_ages, ["patients"])
+    p.add("lab_flags", dq.validate_lab_ranges, ["labs"])
+    p.add("date_flags", dq.validate_dates, ["admissions"])
+    p.add("los_flags", dq.validate_length_of_stay_consistency, ["admissions"])
+    p.add("gender_flags", dq.validate_gender_codes, ["patients"])
+    p.add("icd_flags", dq.validate_icd10_format, ["patients"])
+    p.add("cross_table", dq.cross_table_consistency, ["patients", "admissions", "labs"])
+
+    p.add("summary", analytics.multi_level_summary, ["adm_enriched"])
+    p.add("timeline", analytics.add_timeline_features, ["adm_enriched"])
+    p.add("high_risk", analytics.high_risk_subset, ["adm_enriched"])
+    p.add("patient_view", analytics.create_comprehensive_patient_view, ["patients", "labs", "admissions"])
+    p.add("pediatric_by_age", analytics.pediatric_analysis_by_age_group, ["adm_enriched"])
+    p.add("clinical_flags", analytics.calculate_clinical_flags, ["adm_enriched"])
+
+    p.add("labs_clean", etl.simple_cleaning, ["labs"],
+          dropna_cols=["PatientID", "TestResultValue"], numeric_coerce=["TestResultValue"])
+    p.add("star_schema", etl.build_star_schema, ["patients", "admissions", "labs_clean"])
+    return p
+
+
+__all__ = [
+    "fingerprint",
+    "Node",
+    "Pipeline",
+    "healthcare_pipeline",
+]
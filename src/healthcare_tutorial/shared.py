@@ -0,0 +1,207 @@
+from __future__ import annotations
+import atexit
+import sys
+import uuid
+import weakref
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+import numpy as np
+import pandas as pd
+
+# Shared-memory table handoff for process pools. The parent publishes each DataFrame once
+# as an Arrow IPC file inside a multiprocessing.shared_memory segment and sends workers a
+# small picklable TableHandle; workers map the segment and get read-only DataFrames or
+# NumPy column views backed by it instead of unpickling a private copy per task.
+#
+#   with SharedTables() as shared:
+#       handles = shared.publish(patients=patients, admissions=admissions, labs=labs)
+#       with ProcessPoolExecutor() as pool:
+#           list(pool.map(task, [handles["admissions"]] * 8))
+#
+#   def task(handle):
+#       return validate_dates(attach(handle)).sum()
+#
+# Zero-copy in the worker: numeric and datetime columns (NaN/NaT are stored as values,
+# not Arrow nulls) and string columns; bool, categorical and nullable extension columns
+# are rebuilt on attach. The index is not shared; workers see a RangeIndex.
+# pyarrow is imported inside the functions that need it.
+
+_PREFIX = "hct_"
+
+
+@dataclass(frozen=True)
+class TableHandle:
+    """Picklable reference to a published table."""
+    name: str
+    segment: str
+    size: int
+    rows: int
+    columns: tuple[str, ...]
+
+
+def _arrow_column(s: pd.Series):
+    import pyarrow as pa
+    if isinstance(s.dtype, np.dtype) and s.dtype.kind in "iuf":
+        # from_pandas=False keeps NaN as a float value, so no validity bitmap is written
+        return pa.array(s.to_numpy(), from_pandas=False)
+    if isinstance(s.dtype, np.dtype) and s.dtype.kind in "mM":
+        # Store the raw int64 ticks: NaT round-trips as its sentinel without an Arrow null
+        values = np.ascontiguousarray(s.to_numpy())
+        return pa.Array.from_buffers(pa.from_numpy_dtype(values.dtype), len(values),
+                                     [None, pa.py_buffer(values.view(np.int64))])
+    return pa.array(s, from_pandas=True)
+
+
+def _to_arrow(df: pd.DataFrame):
+    import pyarrow as pa
+    meta = pa.Schema.from_pandas(df, preserve_index=False).metadata  # restores extension dtypes
+    table = pa.table({str(c): _arrow_column(df[c]) for c in df.columns})
+    return table.replace_schema_metadata(meta)
+
+
+def _unlink_segments(segments: dict) -> None:
+    for shm in segments.values():
+        try:
+            shm.close()
+        except BufferError:
+            pass  # still viewed in this process; unlinking below is enough
+        try:
+            shm.unlink()
+        except FileNotFoundError:
+            pass
+    segments.clear()
+
+
+class SharedTables:
+    """Owner of published tables; close() (or leaving the with block) unlinks them.
+
+    Segments are also unlinked when the object is garbage collected, and the resource
+    tracker removes them if the publishing process dies.
+    """
+
+    def __init__(self):
+        self._segments: dict[str, shared_memory.SharedMemory] = {}
+        self.handles: dict[str, TableHandle] = {}
+        self._finalizer = weakref.finalize(self, _unlink_segments, self._segments)
+
+    def publish_table(self, name: str, df: pd.DataFrame) -> TableHandle:
+        """Copy `df` into a new shared segment (replacing an earlier table of that name)."""
+        import pyarrow as pa
+        if name in self.handles:
+            self.unpublish(name)
+        table = _to_arrow(df)
+        sink = pa.MockOutputStream()
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        size = max(1, sink.size())
+        shm = shared_memory.SharedMemory(name=f"{_PREFIX}{uuid.uuid4().hex[:12]}", create=True, size=size)
+        self._segments[shm.name] = shm
+        buf = pa.py_buffer(shm.buf)
+        with pa.ipc.new_file(pa.FixedSizeBufferWriter(buf), table.schema) as writer:
+            writer.write_table(table)
+        del buf  # release the export so close() can unmap the segment
+        handle = TableHandle(name, shm.name, size, len(df), tuple(str(c) for c in df.columns))
+        self.handles[name] = handle
+        return handle
+
+    def publish(self, **tables: pd.DataFrame) -> dict[str, TableHandle]:
+        """Publish several tables, e.g. publish(patients=p, admissions=a, labs=l)."""
+        return {name: self.publish_table(name, df) for name, df in tables.items()}
+
+    def unpublish(self, name: str) -> None:
+        handle = self.handles.pop(name)
+        _unlink_segments({handle.segment: self._segments.pop(handle.segment)})
+
+    def close(self) -> None:
+        self.handles.clear()
+        self._finalizer()
+
+    def __enter__(self) -> "SharedTables":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+# Worker side: segment name -> (SharedMemory, Arrow table); mapped once per process
+_ATTACHED: dict[str, tuple] = {}
+
+
+def _open_segment(name: str) -> shared_memory.SharedMemory:
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    # Before 3.13 every attach registers the segment with the resource tracker, which
+    # unlinks it when that tracker exits (bpo-39959). Pool workers share the publisher's
+    # tracker, where the registration is a harmless duplicate; a process with its own
+    # tracker must unregister or it would destroy the segment for everyone on exit.
+    from multiprocessing import resource_tracker
+    shared_tracker = getattr(resource_tracker._resource_tracker, "_fd", None) is not None
+    shm = shared_memory.SharedMemory(name=name)
+    if not shared_tracker:
+        resource_tracker.unregister(shm._name, "shared_memory")
+    return shm
+
+
+def _open_table(handle: TableHandle):
+    entry = _ATTACHED.get(handle.segment)
+    if entry is not None and entry[1] is not None:
+        return entry[1]
+    import pyarrow as pa
+    shm = entry[0] if entry is not None else _open_segment(handle.segment)
+    view = pa.py_buffer(shm.buf.toreadonly())[:handle.size]
+    table = pa.ipc.open_file(view).read_all()
+    _ATTACHED[handle.segment] = (shm, table)
+    return table
+
+
+def attach(handle: TableHandle, columns: list[str] | None = None, arrow_dtypes: bool = False) -> pd.DataFrame:
+    """Read-only DataFrame backed by the shared segment.
+
+    arrow_dtypes=True returns pd.ArrowDtype columns, which are zero-copy for every type.
+    """
+    table = _open_table(handle)
+    if columns is not None:
+        table = table.select(columns)
+    if arrow_dtypes:
+        return table.to_pandas(types_mapper=pd.ArrowDtype)
+    return table.to_pandas(split_blocks=True)
+
+
+def attach_columns(handle: TableHandle, columns: list[str] | None = None) -> dict[str, np.ndarray]:
+    """Read-only NumPy arrays by column name (views for numeric/datetime columns)."""
+    table = _open_table(handle)
+    return {c: table.column(c).to_numpy() for c in (columns or handle.columns)}
+
+
+def detach(handle: TableHandle | None = None) -> list[str]:
+    """Unmap one table (or all) in this process; returns segments still in use.
+
+    Frames and arrays from attach() must be dropped first, otherwise the mapping stays.
+    """
+    segments = [handle.segment] if handle is not None else list(_ATTACHED)
+    busy = []
+    for seg in segments:
+        entry = _ATTACHED.pop(seg, None)
+        if entry is None:
+            continue
+        shm = entry[0]
+        del entry  # drops this module's reference to the Arrow table
+        try:
+            shm.close()
+        except BufferError:
+            _ATTACHED[seg] = (shm, None)  # the table is re-read on the next attach
+            busy.append(seg)
+    return busy
+
+
+# Unmap before interpreter teardown, while the tables can still be released in order
+atexit.register(detach)
+
+
+__all__ = [
+    "TableHandle",
+    "SharedTables",
+    "attach",
+    "attach_columns",
+    "detach",
+]
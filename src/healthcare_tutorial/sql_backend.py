@@ -0,0 +1,221 @@
+from __future__ import annotations
+import sqlite3
+import pandas as pd
+import numpy as np
+from .instrument import instrument
+
+# Embedded SQL backend: bulk-load patients/admissions/labs into SQLite (or DuckDB when
+# installed) with indexes on PatientID and dates, then run sql/healthcare_examples.sql and
+# the analytics summaries as SQL, returning DataFrames.
+
+_INDEXES = {
+    "patients": [("ix_patients_pid", "PatientID")],
+    "admissions": [
+        ("ix_admissions_pid_date", "PatientID, AdmissionDate"),
+        ("ix_admissions_site", "HospitalSite"),
+        ("ix_admissions_date", "AdmissionDate"),
+    ],
+    "labs": [
+        ("ix_labs_pid_date", "PatientID, CollectedDate"),
+        ("ix_labs_date", "CollectedDate"),
+    ],
+}
+
+# Admissions with patient Age/DiagnosisName, mirroring the tutorial's adm_enriched merge
+_ENRICHED_VIEW = """
+CREATE VIEW IF NOT EXISTS admissions_enriched AS
+SELECT a.PatientID, a.AdmissionDate, a.DischargeDate, a.LengthOfStay, a.HospitalSite,
+       p.Age, p.DiagnosisName
+FROM admissions a
+LEFT JOIN patients p ON p.PatientID = a.PatientID
+"""
+
+_MULTI_LEVEL_SQL = """
+WITH ranked AS (
+    SELECT HospitalSite, DiagnosisName, Age,
+           ROW_NUMBER() OVER (PARTITION BY HospitalSite, DiagnosisName ORDER BY Age) AS rn,
+           COUNT(*) OVER (PARTITION BY HospitalSite, DiagnosisName) AS cnt
+    FROM admissions_enriched
+    WHERE Age IS NOT NULL
+),
+med AS (
+    SELECT HospitalSite, DiagnosisName, AVG(Age) AS age_median
+    FROM ranked
+    -- Middle row(s) without integer division: "/" truncates in SQLite but not in DuckDB
+    WHERE rn BETWEEN cnt / 2.0 AND cnt / 2.0 + 1
+    GROUP BY HospitalSite, DiagnosisName
+)
+SELECT e.HospitalSite, e.DiagnosisName,
+       AVG(e.Age) AS age_mean, m.age_median, COUNT(e.Age) AS age_count,
+       AVG(e.LengthOfStay) AS los_mean, COUNT(e.LengthOfStay) AS los_n,
+       SUM(e.LengthOfStay * 1.0 * e.LengthOfStay) AS los_sumsq,
+       COUNT(DISTINCT e.PatientID) AS pid_nunique
+FROM admissions_enriched e
+LEFT JOIN med m ON m.HospitalSite = e.HospitalSite AND m.DiagnosisName = e.DiagnosisName
+WHERE e.HospitalSite IS NOT NULL AND e.DiagnosisName IS NOT NULL
+GROUP BY e.HospitalSite, e.DiagnosisName, m.age_median
+ORDER BY e.HospitalSite, e.DiagnosisName
+"""
+
+_LAB_SUMMARY_SQL = """
+SELECT PatientID,
+       COUNT(LabTestName) AS LabTestName_count,
+       AVG(TestResultValue) AS TestResultValue_mean,
+       COUNT(TestResultValue) AS _n,
+       SUM(TestResultValue * TestResultValue) AS _sumsq
+FROM labs
+GROUP BY PatientID
+"""
+
+_ADMISSION_SUMMARY_SQL = """
+SELECT PatientID,
+       COUNT(AdmissionDate) AS Admission_count,
+       MIN(AdmissionDate) AS FirstAdmission,
+       MAX(AdmissionDate) AS LastAdmission,
+       AVG(LengthOfStay) AS LengthOfStay_mean,
+       SUM(LengthOfStay) AS LengthOfStay_sum
+FROM admissions
+GROUP BY PatientID
+"""
+
+
+def _sample_std(mean: pd.Series, n: pd.Series, sumsq: pd.Series) -> pd.Series:
+    """ddof=1 std from streaming sums (SQLite has no STDDEV)."""
+    var = (sumsq - n * mean ** 2) / (n - 1)
+    return np.sqrt(var.clip(lower=0)).where(n > 1)
+
+
+def split_sql_statements(script: str) -> list[str]:
+    """Split a script into complete statements, dropping comment-only chunks."""
+    stmts, buf = [], ""
+    for line in script.splitlines(keepends=True):
+        if not buf and line.strip().startswith("--"):
+            continue
+        buf += line
+        if sqlite3.complete_statement(buf):
+            if buf.strip():
+                stmts.append(buf.strip())
+            buf = ""
+    if buf.strip():
+        stmts.append(buf.strip())
+    return stmts
+
+
+class SQLBackend:
+    """In-process SQL engine holding the three tutorial tables.
+
+    engine: "sqlite", "duckdb" or "auto" (DuckDB if importable, else SQLite).
+    path: database file, or ":memory:".
+    """
+
+    def __init__(self, path: str = ":memory:", engine: str = "auto"):
+        if engine == "auto":
+            try:
+                import duckdb  # noqa: F401
+                engine = "duckdb"
+            except ImportError:
+                engine = "sqlite"
+        self.engine = engine
+        if engine == "duckdb":
+            import duckdb
+            self.conn = duckdb.connect(path)
+        elif engine == "sqlite":
+            self.conn = sqlite3.connect(path, check_same_thread=False)
+            self.conn.execute("PRAGMA journal_mode=OFF")
+            self.conn.execute("PRAGMA synchronous=OFF")
+            self.conn.execute("PRAGMA temp_store=MEMORY")
+        else:
+            raise ValueError(f"unknown engine: {engine}")
+        self.tables: dict[str, int] = {}
+
+    def __enter__(self) -> "SQLBackend":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def _load_table(self, name: str, df: pd.DataFrame, chunksize: int) -> None:
+        self.conn.execute("DROP VIEW IF EXISTS admissions_enriched")
+        if self.engine == "duckdb":
+            self.conn.register("_incoming", df)
+            self.conn.execute(f"CREATE OR REPLACE TABLE {name} AS SELECT * FROM _incoming")
+            self.conn.unregister("_incoming")
+        else:
+            df.to_sql(name, self.conn, index=False, if_exists="replace", chunksize=chunksize)
+        for ix_name, cols in _INDEXES.get(name, []):
+            if all(c.strip() in df.columns for c in cols.split(",")):
+                self.conn.execute(f"CREATE INDEX IF NOT EXISTS {ix_name} ON {name} ({cols})")
+        if self.engine == "sqlite":
+            self.conn.execute(f"ANALYZE {name}")
+            self.conn.commit()
+
+    @instrument
+    def load_tables(self, patients: pd.DataFrame, admissions: pd.DataFrame, labs: pd.DataFrame,
+                    chunksize: int = 200_000) -> "SQLBackend":
+        """Bulk-load the tables (replacing existing ones) and create indexes."""
+        for name, df in (("patients", patients), ("admissions", admissions), ("labs", labs)):
+            self._load_table(name, df, chunksize)
+            self.tables[name] = len(df)
+        self.conn.execute(_ENRICHED_VIEW)
+        return self
+
+    def query(self, sql: str, params: tuple | dict | None = None,
+              parse_dates: list[str] | None = None) -> pd.DataFrame:
+        """Run one SELECT and return the result as a DataFrame."""
+        if self.engine == "duckdb":
+            out = self.conn.execute(sql, params or []).df()
+        else:
+            out = pd.read_sql_query(sql, self.conn, params=params)
+        for c in parse_dates or []:
+            if c in out.columns:
+                out[c] = pd.to_datetime(out[c], errors="coerce")
+        return out
+
+    @instrument
+    def run_script(self, path: str) -> list[pd.DataFrame]:
+        """Execute every statement in a .sql file; returns one DataFrame per statement."""
+        with open(path) as f:
+            script = f.read()
+        return [self.query(stmt) for stmt in split_sql_statements(script)]
+
+    @instrument
+    def multi_level_summary(self) -> pd.DataFrame:
+        """SQL equivalent of analytics.multi_level_summary on admissions_enriched."""
+        raw = self.query(_MULTI_LEVEL_SQL).set_index(["HospitalSite", "DiagnosisName"])
+        out = pd.DataFrame({
+            ("Age", "mean"): raw["age_mean"],
+            ("Age", "median"): raw["age_median"],
+            ("Age", "count"): raw["age_count"],
+            ("LengthOfStay", "mean"): raw["los_mean"],
+            ("LengthOfStay", "std"): _sample_std(raw["los_mean"], raw["los_n"], raw["los_sumsq"]),
+            ("PatientID", "nunique"): raw["pid_nunique"],
+        }, index=raw.index)
+        return out.round(2)
+
+    @instrument
+    def create_comprehensive_patient_view(self) -> pd.DataFrame:
+        """SQL equivalent of analytics.create_comprehensive_patient_view."""
+        patients = self.query("SELECT * FROM patients")
+        labs = self.query(_LAB_SUMMARY_SQL)
+        labs["TestResultValue_std"] = _sample_std(labs["TestResultValue_mean"], labs["_n"], labs["_sumsq"])
+        labs = labs.drop(columns=["_n", "_sumsq"])
+        adm = self.query(_ADMISSION_SUMMARY_SQL, parse_dates=["FirstAdmission", "LastAdmission"])
+        out = patients.merge(labs, on="PatientID", how="left")
+        return out.merge(adm, on="PatientID", how="left")
+
+    def patient_history(self, patient_id: int) -> tuple[pd.DataFrame, pd.DataFrame]:
+        """Indexed lookup of one patient's admissions and labs."""
+        adm = self.query("SELECT * FROM admissions WHERE PatientID = ? ORDER BY AdmissionDate",
+                         (int(patient_id),), parse_dates=["AdmissionDate", "DischargeDate"])
+        labs = self.query("SELECT * FROM labs WHERE PatientID = ? ORDER BY CollectedDate",
+                          (int(patient_id),), parse_dates=["CollectedDate"])
+        return adm, labs
+
+
+__all__ = [
+    "SQLBackend",
+    "split_sql_statements",
+]
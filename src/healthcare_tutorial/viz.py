@@ -1,27 +1,133 @@
 from __future__ import annotations
+import os
+import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
 
+# Plots render from compact summaries (histogram bins, per-site aggregates, a bucketed
+# missingness matrix) so plotting time does not grow with table size. Pass cache_dir to
+# reuse a PNG rendered earlier from an identical summary.
 
-def show_missing_matrix(df: pd.DataFrame):
-    try:
-        import missingno as msno
-        msno.matrix(df)
-    except Exception:
-        print("missingno not available")
 
+def histogram_summary(series: pd.Series, bins: int = 20,
+                      value_range: tuple[float, float] | None = None,
+                      chunk_size: int = 1_000_000) -> tuple[np.ndarray, np.ndarray]:
+    """(counts, edges) of a numeric series, binned chunk by chunk with np.histogram."""
+    if series.dtype == np.float64:
+        values = series.to_numpy()  # no copy; to_numeric and na_value would both make one
+    else:
+        values = pd.to_numeric(series, errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+    if value_range is None:
+        # Range from per-chunk min/max, so no full-length filtered copy is made
+        lo, hi = np.inf, -np.inf
+        for i in range(0, len(values), chunk_size):
+            chunk = values[i:i + chunk_size]
+            finite = chunk[np.isfinite(chunk)]
+            if len(finite):
+                lo, hi = min(lo, finite.min()), max(hi, finite.max())
+        value_range = (float(lo), float(hi)) if lo <= hi else (0.0, 1.0)
+    edges = np.histogram_bin_edges([], bins=bins, range=value_range)
+    counts = np.zeros(len(edges) - 1, dtype=np.int64)
+    for i in range(0, len(values), chunk_size):
+        chunk = values[i:i + chunk_size]
+        counts += np.histogram(chunk[np.isfinite(chunk)], bins=edges)[0]
+    return counts, edges
 
-def plot_age_distribution(df: pd.DataFrame, age_col: str = "Age"):
-    df[age_col].dropna().plot(kind="hist", bins=20, alpha=0.7, title="Age Distribution")
-    plt.xlabel(age_col); plt.ylabel("Count"); plt.tight_layout(); plt.show()
 
+def site_summary(df: pd.DataFrame, value_col: str = "LengthOfStay",
+                 site_col: str = "HospitalSite") -> pd.DataFrame:
+    """Per-site count and mean of `value_col`, sorted by mean."""
+    return (df.groupby(site_col, observed=True)[value_col]
+            .agg(["count", "mean"]).sort_values("mean"))
 
-def plot_los_by_site(df: pd.DataFrame):
-    ax = df.groupby("HospitalSite")["LengthOfStay"].mean().sort_values().plot(kind="bar", title="Mean LOS by Site")
-    ax.set_ylabel("Days"); plt.tight_layout(); plt.show()
+
+def missingness_summary(df: pd.DataFrame, max_rows: int = 1000) -> pd.DataFrame:
+    """Fraction missing per column in at most `max_rows` contiguous row buckets."""
+    n = len(df)
+    n_buckets = max(1, min(max_rows, n))
+    bucket = (np.arange(n) * n_buckets // max(n, 1)).astype(np.int64)
+    sizes = np.bincount(bucket, minlength=n_buckets)
+    frac = {}
+    for c in df.columns:
+        missing = df[c].isna().to_numpy()
+        frac[c] = np.bincount(bucket, weights=missing, minlength=n_buckets) / np.maximum(sizes, 1)
+    return pd.DataFrame(frac, index=pd.RangeIndex(n_buckets, name="RowBucket"))
+
+
+def _cached_png(cache_dir: str | None, kind: str, summary) -> str | None:
+    if cache_dir is None:
+        return None
+    from .pipeline import fingerprint
+    os.makedirs(cache_dir, exist_ok=True)
+    return os.path.join(cache_dir, f"{kind}-{fingerprint(summary)[:24]}.png")
+
+
+def _show_png(path: str):
+    import matplotlib.pyplot as plt
+    fig, ax = plt.subplots()
+    ax.imshow(plt.imread(path)); ax.axis("off")
+    plt.tight_layout(); plt.show()
+    return ax
+
+
+def _finish(ax, png: str | None):
+    import matplotlib.pyplot as plt
+    plt.tight_layout()
+    if png is not None:
+        ax.figure.savefig(png, dpi=100)
+    plt.show()
+    return ax
+
+
+def show_missing_matrix(df: pd.DataFrame, max_rows: int = 1000, cache_dir: str | None = None):
+    if len(df) <= max_rows and cache_dir is None:
+        try:
+            import missingno as msno
+            msno.matrix(df)
+            return None
+        except Exception:
+            pass
+    summary = missingness_summary(df, max_rows=max_rows)
+    png = _cached_png(cache_dir, "missing", (summary, len(df)))
+    if png is not None and os.path.exists(png):
+        return _show_png(png)
+    import matplotlib.pyplot as plt
+    fig, ax = plt.subplots(figsize=(max(6, 0.5 * len(summary.columns)), 6))
+    ax.imshow(1 - summary.to_numpy(), aspect="auto", cmap="gray", vmin=0, vmax=1, interpolation="nearest")
+    ax.set_xticks(range(len(summary.columns)))
+    ax.set_xticklabels(summary.columns, rotation=90)
+    ax.set_ylabel(f"rows ({len(df):,} in {len(summary)} buckets)")
+    ax.set_title("Missingness (white = present)")
+    return _finish(ax, png)
+
+
+def plot_age_distribution(df: pd.DataFrame, age_col: str = "Age", bins: int = 20,
+                          cache_dir: str | None = None):
+    counts, edges = histogram_summary(df[age_col], bins=bins)
+    png = _cached_png(cache_dir, "age", (counts, edges, age_col))
+    if png is not None and os.path.exists(png):
+        return _show_png(png)
+    import matplotlib.pyplot as plt
+    fig, ax = plt.subplots()
+    ax.stairs(counts, edges, fill=True, alpha=0.7)
+    ax.set_title("Age Distribution")
+    ax.set_xlabel(age_col); ax.set_ylabel("Count")
+    return _finish(ax, png)
+
+
+def plot_los_by_site(df: pd.DataFrame, cache_dir: str | None = None):
+    summary = site_summary(df, "LengthOfStay", "HospitalSite")
+    png = _cached_png(cache_dir, "los_by_site", summary)
+    if png is not None and os.path.exists(png):
+        return _show_png(png)
+    ax = summary["mean"].plot(kind="bar", title="Mean LOS by Site")
+    ax.set_ylabel("Days")
+    return _finish(ax, png)
 
 
 __all__ = [
+    "histogram_summary",
+    "site_summary",
+    "missingness_summary",
     "show_missing_matrix",
     "plot_age_distribution",
     "plot_los_by_site",
@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from healthcare_tutorial.analytics import attribute_labs_to_admissions, daily_census
+
+
+def _expanded_census(admissions: pd.DataFrame, start: pd.Timestamp, end: pd.Timestamp) -> pd.Series:
+    """Reference census: one row per (site, patient-day) for admit <= day < discharge."""
+    days = pd.date_range(start, end, freq="D")
+    rows = []
+    for site, admit, disch in admissions[["HospitalSite", "AdmissionDate", "DischargeDate"]].itertuples(index=False):
+        if pd.isna(admit) or pd.isna(site):
+            continue
+        stop = end + pd.Timedelta(days=1) if pd.isna(disch) else disch
+        rows += [(site, day) for day in days if admit <= day < stop]
+    counts = pd.Series(1, index=pd.MultiIndex.from_tuples(rows, names=["HospitalSite", "Date"]) if rows else None)
+    full = pd.MultiIndex.from_product([sorted(admissions["HospitalSite"].dropna().unique()), days],
+                                      names=["HospitalSite", "Date"])
+    return counts.groupby(level=[0, 1]).sum().reindex(full, fill_value=0) if rows else pd.Series(0, index=full)
+
+
+def test_inverted_stay_does_not_lower_census():
+    admissions = pd.DataFrame({
+        "PatientID": [1, 2],
+        "AdmissionDate": pd.to_datetime(["2023-01-01", "2023-01-10"]),
+        "DischargeDate": pd.to_datetime(["2023-01-20", "2023-01-05"]),
+        "HospitalSite": ["HSC", "HSC"],
+    })
+    census = daily_census(admissions).set_index("Date")["Census"]
+    assert (census.loc["2023-01-01":"2023-01-19"] == 1).all()
+    assert census.loc["2023-01-20"] == 0
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_census_matches_day_by_day_expansion(seed):
+    rng = np.random.default_rng(seed)
+    n = 40
+    admit = pd.Timestamp("2023-01-01") + pd.to_timedelta(rng.integers(0, 30, n), unit="D")
+    los = rng.integers(-5, 10, n)  # negative: discharged before admission
+    admissions = pd.DataFrame({
+        "PatientID": rng.integers(1, 15, n),
+        "AdmissionDate": admit,
+        "DischargeDate": (admit + pd.to_timedelta(los, unit="D")).where(rng.random(n) > 0.1),
+        "HospitalSite": rng.choice(["HSC", "CHEO", None], n, p=[0.45, 0.45, 0.1]),
+    })
+    admissions.loc[rng.random(n) < 0.05, "AdmissionDate"] = pd.NaT
+    start, end = pd.Timestamp("2022-12-25"), pd.Timestamp("2023-02-15")
+
+    got = daily_census(admissions, start=start, end=end)
+    expected = _expanded_census(admissions, start, end)
+    # Both are ordered by (site, date)
+    assert list(got["HospitalSite"]) == list(expected.index.get_level_values(0))
+    np.testing.assert_array_equal(got["Census"].to_numpy(), expected.to_numpy())
+
+
+def test_attribute_labs_with_mixed_id_dtypes():
+    # A missing admission PatientID makes the loader return float ids next to int lab ids
+    admissions = pd.DataFrame({
+        "PatientID": [1.0, np.nan, 2.0],
+        "AdmissionDate": pd.to_datetime(["2023-01-01", "2023-01-01", "2023-01-05"]),
+        "DischargeDate": pd.to_datetime(["2023-01-03", "2023-01-02", "2023-01-06"]),
+    })
+    labs = pd.DataFrame({
+        "PatientID": [1, 2, 2, 1],
+        "CollectedDate": pd.to_datetime(["2023-01-02", "2023-01-05", "2023-01-09", "2023-01-01"]),
+    })
+    out = attribute_labs_to_admissions(labs, admissions)
+    assert out["AdmissionKey"].tolist() == [0, 2, pd.NA, 0]
+    assert out["PatientID"].dtype == labs["PatientID"].dtype
@@ -0,0 +1,20 @@
+import numpy as np
+import pandas as pd
+
+from healthcare_tutorial.cohort import CohortIndex
+
+
+def test_rows_without_patient_id_are_skipped():
+    patients = pd.DataFrame({"PatientID": [1, 2, 3], "Age": [1, 8, 15],
+                             "Gender": ["F", "M", "F"], "HospitalSite": ["HSC", "CHEO", "HSC"]})
+    admissions = pd.DataFrame({
+        "PatientID": [1.0, np.nan, 3.0, 3.0],
+        "AdmissionDate": pd.to_datetime(["2023-01-01", "2023-01-02", "2023-01-03", "2023-02-01"]),
+        "LengthOfStay": [2, 10, 9, 1],
+        "HospitalSite": ["HSC", "LHSC", "HSC", "CHEO"],
+    })
+    idx = CohortIndex.build(patients, admissions)
+    assert "LHSC" not in idx.values("HospitalSite")
+    assert list(idx.cohort("LongStay").ids()) == [3]
+    assert list(idx.where(HospitalSite="HSC").ids()) == [1, 3]
+    assert list(idx.cohort("HospitalSite", "HSC").select(admissions).index) == [0, 2, 3]
@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from healthcare_tutorial import dq
+
+
+def _tables(seed: int = 0):
+    rng = np.random.default_rng(seed)
+    n_pat, n_adm, n_lab = 60, 60, 80
+    patients = pd.DataFrame({
+        "PatientID": np.arange(1, n_pat + 1),
+        "Age": rng.integers(-2, 22, n_pat),
+        "Gender": rng.choice(["M", "F", "X"], n_pat),
+        "DiagnosisName": rng.choice(["J45.909", "Asthma", "S52.5"], n_pat),
+    })
+    # Few distinct dates, so consecutive batches share their boundary dates
+    admit = pd.Timestamp("2023-01-01") + pd.to_timedelta(np.sort(rng.integers(0, 12, n_adm)), unit="D")
+    los = rng.integers(-2, 8, n_adm)
+    admissions = pd.DataFrame({
+        "PatientID": rng.integers(1, n_pat + 6, n_adm).astype(float),
+        "AdmissionDate": admit,
+        "DischargeDate": admit + pd.to_timedelta(los, unit="D"),
+        "LengthOfStay": np.where(rng.random(n_adm) < 0.1, los + 1, los),
+    })
+    labs = pd.DataFrame({
+        "PatientID": rng.integers(1, n_pat + 6, n_lab).astype(float),
+        "LabTestName": rng.choice(list(dq.LAB_RANGES), n_lab),
+        "TestResultValue": rng.normal(100, 60, n_lab),
+        "CollectedDate": pd.Timestamp("2023-01-01") + pd.to_timedelta(np.sort(rng.integers(0, 12, n_lab)), unit="D"),
+    })
+    admissions.loc[[5, 40], "PatientID"] = np.nan
+    labs.loc[[3, 50, 77], "PatientID"] = np.nan
+    labs.loc[20, "CollectedDate"] = pd.NaT
+    # A late-arriving, out-of-range lab appended after later-dated ones
+    labs.loc[79, ["PatientID", "LabTestName", "TestResultValue"]] = [7.0, "Sodium", 400.0]
+    labs.loc[79, "CollectedDate"] = pd.Timestamp("2022-12-01")
+    return patients, admissions, labs
+
+
+def _full_counts(patients, admissions, labs) -> dict:
+    expected = {}
+    for table, df in (("patients", patients), ("admissions", admissions), ("labs", labs)):
+        expected[(table, "rows_checked")] = len(df)
+        for rule in dq.INCREMENTAL_RULES[table]:
+            for col, n in rule(df).sum().items():
+                expected[(table, col)] = int(n)
+    for rule, n in dq.cross_table_consistency(patients, admissions, labs).items():
+        expected[("cross_table", rule)] = n
+    return expected
+
+
+@pytest.mark.parametrize("watermark", ["row", "date"])
+def test_batched_runs_match_full_rerun(tmp_path, watermark):
+    patients, admissions, labs = _tables()
+    # Four appends; patients 41-60 arrive after some of their admissions and labs, the
+    # third run has new admissions but no new labs
+    cuts = [(20, 20, 27), (40, 33, 55), (50, 45, 55), (60, 60, 80)]
+    for n_pat, n_adm, n_lab in cuts:
+        report = dq.incremental_dq(patients.iloc[:n_pat], admissions.iloc[:n_adm], labs.iloc[:n_lab],
+                                   state_dir=str(tmp_path), watermark=watermark)
+        expected = _full_counts(patients.iloc[:n_pat], admissions.iloc[:n_adm], labs.iloc[:n_lab])
+        got = {key: report.loc[key, "cumulative"] for key in expected}
+        assert got == expected
+    if watermark == "date":
+        assert report.loc[("labs", "late_rows"), "delta"] == 1
+
+
+def test_run_without_new_rows_in_a_table(tmp_path):
+    patients, admissions, labs = _tables()
+    dq.incremental_dq(patients, admissions.iloc[:30], labs, state_dir=str(tmp_path))
+    report = dq.incremental_dq(patients, admissions, labs, state_dir=str(tmp_path))
+    assert report.loc[("labs", "rows_checked"), "delta"] == 0
+    assert report.loc[("labs", "below_range"), "delta"] == 0
+    assert report.loc[("labs", "below_range"), "cumulative"] == dq.validate_lab_ranges(labs)["below_range"].sum()
+    assert report.loc[("admissions", "rows_checked"), "delta"] == 30
+
+
+def test_missing_patient_id_counts_as_unknown(tmp_path):
+    patients = pd.DataFrame({"PatientID": [1, 2]})
+    admissions = pd.DataFrame({"PatientID": [1, np.nan]})
+    labs = pd.DataFrame({"PatientID": pd.Series([], dtype=float)})
+    report = dq.incremental_dq(patients, admissions, labs, state_dir=str(tmp_path), rules={})
+    assert dq.cross_table_consistency(patients, admissions, labs)["admissions_with_unknown_patient"] == 1
+    assert report.loc[("cross_table", "admissions_with_unknown_patient"), "delta"] == 1
+    assert report.loc[("cross_table", "admissions_with_unknown_patient"), "cumulative"] == 1
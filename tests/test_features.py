@@ -0,0 +1,25 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from healthcare_tutorial.features import build_lab_features
+
+
+def test_labs_without_patient_id_are_dropped():
+    labs = pd.DataFrame({
+        "PatientID": [1.0, np.nan, 2.0, 1.0],
+        "LabTestName": ["Sodium", "Sodium", "Glucose", "Sodium"],
+        "TestResultValue": [140.0, 999.0, 5.0, 136.0],
+        "CollectedDate": pd.to_datetime(["2023-01-01", "2023-01-02", "2023-01-01", "2023-01-03"]),
+    })
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        feats = build_lab_features(labs)
+        aligned = build_lab_features(labs, patient_ids=[2, np.nan, 1])
+    assert list(feats.patient_ids) == [1, 2]
+    dense = pd.DataFrame(feats.matrix.toarray(), index=feats.patient_ids, columns=feats.feature_names)
+    assert dense.loc[1, "Sodium_max"] == 140.0
+    assert dense.loc[1, "Sodium_latest"] == 136.0
+    assert dense.loc[1, "Sodium_count"] == 2
+    assert list(aligned.patient_ids) == [2, 1]
@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from healthcare_tutorial.data_gen import SyntheticConfig, make_patients
+from healthcare_tutorial.linkage import deduplicate_patients, link_patients
+
+FIRST = ["Ava", "Liam", "Noah", "Emma", "Olivia", "Lucas", "Mia", "Ethan", "Zoe", "Leo"]
+LAST = ["Smith", "Tremblay", "Roy", "Martin", "Lee", "Wilson", "Gagnon", "Brown", "Singh", "Côté"]
+
+
+def _named_patients(n: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    patients = make_patients(SyntheticConfig(n_patients=n))
+    patients["FirstName"] = rng.choice(FIRST, n)
+    patients["LastName"] = rng.choice(LAST, n)
+    patients["BirthDate"] = (pd.Timestamp("2006-01-01")
+                             + pd.to_timedelta(rng.integers(0, 6500, n), unit="D")).strftime("%Y-%m-%d")
+    return patients.drop_duplicates(["FirstName", "LastName", "BirthDate"]).reset_index(drop=True)
+
+
+def test_refuses_to_link_without_identifying_fields():
+    with pytest.raises(ValueError, match="identifying"):
+        deduplicate_patients(make_patients(SyntheticConfig(n_patients=1000)))
+
+
+def test_distinct_patients_survive_and_formatting_variants_merge():
+    patients = _named_patients(5000)
+    assert len(deduplicate_patients(patients)) == len(patients)
+
+    variants = patients.head(200).copy()
+    variants["PatientID"] += 1_000_000
+    variants["FirstName"] = "  " + variants["FirstName"].str.upper() + "."
+    variants["LastName"] = variants["LastName"].str.lower()
+    variants["Gender"] = variants["Gender"].map({"M": "male", "F": "Female"})
+    combined = pd.concat([patients, variants], ignore_index=True)
+
+    clusters = link_patients(combined)
+    assert (clusters.iloc[len(patients):].to_numpy() == patients["PatientID"].head(200).to_numpy()).all()
+    deduped = deduplicate_patients(combined)
+    assert len(deduped) == len(patients)
+    assert set(deduped["PatientID"]) == set(patients["PatientID"])
@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from healthcare_tutorial import loaders
+
+
+def _write_extract(path, admit_dates, lab_dates):
+    path.mkdir()
+    pd.DataFrame({"PatientID": [1, 2], "Age": [3, 9], "BirthDate": ["2020-01-05", "2014-07-01"]}) \
+        .to_csv(path / "patients.csv", index=False)
+    pd.DataFrame({"PatientID": [1, np.nan], "AdmissionDate": admit_dates, "DischargeDate": admit_dates,
+                  "LengthOfStay": [0, 0]}).to_csv(path / "admissions.csv", index=False)
+    pd.DataFrame({"PatientID": [1, 2], "LabTestName": ["Sodium", "Glucose"], "TestResultValue": [140.0, 5.1],
+                  "CollectedDate": lab_dates}).to_csv(path / "labs.csv", index=False)
+
+
+def _default_parser(path) -> list[pd.DataFrame]:
+    out = []
+    for name, cols in zip(loaders._CSV_FILES, loaders._DATE_COLS):
+        df = pd.read_csv(path / name)
+        for c in cols:
+            df[c] = pd.to_datetime(df[c], errors="coerce")
+        out.append(df)
+    return out
+
+
+@pytest.mark.parametrize("dates", [
+    ["2023-01-01", "2023-01-02"],
+    ["2023-01-01T10:00:00Z", "2023-01-02T11:30:00Z"],
+])
+def test_single_source_matches_default_parser(tmp_path, dates):
+    _write_extract(tmp_path / "site", dates, dates)
+    got = loaders.load_healthcare_data(str(tmp_path / "site"))
+    for g, expected in zip(got, _default_parser(tmp_path / "site")):
+        pd.testing.assert_frame_equal(g, expected)
+
+
+def test_multi_source_keeps_timezone_and_missing_ids(tmp_path):
+    dates = ["2023-01-01T10:00:00Z", "2023-01-02T11:30:00Z"]
+    _write_extract(tmp_path / "a", dates, dates)
+    _write_extract(tmp_path / "b", dates, dates)
+    patients, admissions, labs = loaders.load_multi_source_data([str(tmp_path / "a"), str(tmp_path / "b")])
+    assert isinstance(admissions["AdmissionDate"].dtype, pd.DatetimeTZDtype)
+    assert admissions["PatientID"].isna().sum() == 2
+    assert sorted(patients["PatientID"]) == [1, 2, 3, 4]
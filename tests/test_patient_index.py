@@ -0,0 +1,17 @@
+import numpy as np
+import pandas as pd
+
+from healthcare_tutorial.patient_index import PatientIndex
+
+
+def test_rows_without_patient_id_are_left_out():
+    admissions = pd.DataFrame({
+        "PatientID": [2.0, np.nan, 1.0, 2.0],
+        "AdmissionDate": pd.to_datetime(["2023-01-05", "2023-01-01", "2023-01-02", "2023-01-01"]),
+    })
+    labs = pd.DataFrame({"PatientID": [1, 1], "CollectedDate": pd.to_datetime(["2023-01-03", "2023-01-02"])})
+    idx = PatientIndex.build(admissions, labs)
+    assert list(idx.admissions(2)["AdmissionDate"]) == list(pd.to_datetime(["2023-01-01", "2023-01-05"]))
+    assert list(idx.count("admissions", [0, 1, 2, 3])) == [0, 1, 2, 0]
+    assert len(idx.tables["admissions"]) == 3
+    assert list(idx.labs(1)["CollectedDate"]) == list(pd.to_datetime(["2023-01-02", "2023-01-03"]))
@@ -126,7 +126,12 @@ print("High-risk subset size:", len(hi_risk))
 
 #%%
 # Hour 7-8: SQL Practice — see sql/healthcare_examples.sql for queries to try in your DB
-print("Open sql/healthcare_examples.sql for practice queries.")
+# The embedded backend loads the three tables into SQLite (DuckDB if installed) and runs them
+from healthcare_tutorial.sql_backend import SQLBackend
+with SQLBackend() as db:
+    db.load_tables(patients, admissions, labs)
+    for res in db.run_script(os.path.join(ROOT, "sql", "healthcare_examples.sql")):
+        print(res.head())
 
 #%%
 # Evening: Mock Test Practice — set a timer externally; focus on clean, readable code
@@ -210,3 +215,11 @@ print("Cleaning pipeline applied (fit_transform).")
 # Viz: missingness and LOS by site
 show_missing_matrix(patients)
 plot_los_by_site(adm_enriched2)
+
+#%%
+# Bonus: the same workflow as a DAG — independent validators/summaries run concurrently,
+# and node outputs are cached on disk so re-runs only recompute what changed.
+from healthcare_tutorial.pipeline import healthcare_pipeline
+dag = healthcare_pipeline(data_dir=os.path.join(ROOT, "data"), cfg=cfg)
+dag_results = dag.run(max_workers=4, cache_dir=os.path.join(ROOT, ".pipeline_cache"))
+print("DAG nodes run:", list(dag_results))